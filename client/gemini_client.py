@@ -5,8 +5,11 @@ Cliente Gemini optimizado para múltiples function calls en una sola petición
 """
 
 import os
+import json
 import asyncio
+import functools
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
@@ -25,8 +28,56 @@ except ImportError as e:
     print(f"❌ google-generativeai no disponible: {e}")
     GEMINI_AVAILABLE = False
 
+# orjson opcional: serialización más rápida de argumentos
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from mcp_client import SimpleMCPClient
 
+# Prefijo estático del prompt de síntesis: el contenido dinámico va siempre detrás
+FINAL_RESPONSE_PROMPT_PREFIX = (
+    "Basándote en los resultados de herramientas que aparecen a continuación, "
+    "genera una respuesta completa y útil. Proporciona una respuesta clara y "
+    "organizada que sintetice toda la información obtenida."
+)
+
+# Herramientas sin efectos secundarios: solo estas se ejecutan en paralelo entre sí.
+# El resto (teclado/ratón de Hyprland, notas, calendario, Notion, sequentialthinking)
+# se ejecuta en el orden exacto en que el modelo las pidió
+READ_ONLY_TOOLS = frozenset({
+    "get_current_datetime",
+    "google_search",
+    "google_news_search",
+    "google_images_search",
+    "read_note",
+    "search_notes",
+    "list_vault_structure",
+    "get_note_metadata",
+    "list_calendar_events",
+    "get_calendar_summary",
+    "find_free_time",
+    "buscar_paginas",
+    "listar_arcos",
+})
+
+
+def _is_read_only_call(func_call) -> bool:
+    """Indica si una function call es de solo lectura (segura para ejecutar en paralelo)"""
+    return not isinstance(func_call, dict) and func_call.name in READ_ONLY_TOOLS
+
+
+def _args_key(args: Dict[str, Any]) -> str:
+    """Serializa argumentos de forma canónica (claves ordenadas) para comparar llamadas"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(args, option=orjson.OPT_SORT_KEYS, default=str).decode()
+        except TypeError:
+            pass
+    return json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
 
 class ChatMessage:
     """Mensaje simple para el historial"""
@@ -85,6 +136,15 @@ class SimpleGeminiClient:
         self.mcp_client = SimpleMCPClient(debug=debug)
         self.tools_available = False
         
+        # Pool dedicado para las llamadas HTTP bloqueantes del SDK de Gemini
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini")
+        
+        # Síntesis de respaldo (_generate_final_response, solo sin chat_session o si falla la
+        # continuación): con un único resultado corto se devuelve tal cual. En el camino normal
+        # los resultados vuelven al chat para que el modelo pueda encadenar más herramientas
+        self.always_synthesize = False
+        self.direct_result_max_chars = 4000
+        
         if self.debug:
             print(f"✅ Cliente Gemini inicializado: {self.model_name}")
     
@@ -136,25 +196,13 @@ class SimpleGeminiClient:
                 )
                 
                 # Enviar último mensaje
-                if tools:
-                    response = chat_session.send_message(
-                        gemini_history[-1]['parts'][0],
-                        tools=tools
-                    )
-                else:
-                    response = chat_session.send_message(
-                        gemini_history[-1]['parts'][0]
-                    )
+                response = await self._send_message(
+                    chat_session, gemini_history[-1]['parts'][0], tools
+                )
             else:
                 # Primera interacción - necesitamos crear sesión para múltiples function calls
                 chat_session = self.model.start_chat()
-                if tools:
-                    response = chat_session.send_message(
-                        user_message,
-                        tools=tools
-                    )
-                else:
-                    response = chat_session.send_message(user_message)
+                response = await self._send_message(chat_session, user_message, tools)
             
             # Procesar respuesta con sesión para permitir múltiples iteraciones
             final_response = await self._process_response(response, chat_session)
@@ -174,6 +222,27 @@ class SimpleGeminiClient:
             self.chat_history.append(ChatMessage(role="model", content=error_msg))
             return error_msg
     
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Ejecuta una llamada síncrona del SDK en el pool sin bloquear el event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def _send_message(self, chat_session, content, tools=None):
+        """
+        Envía un mensaje a la sesión de chat fuera del event loop
+        
+        Args:
+            chat_session: Sesión de chat de Gemini
+            content: Contenido a enviar
+            tools: Herramientas en formato Gemini (opcional)
+            
+        Returns:
+            Respuesta de Gemini
+        """
+        if tools:
+            return await self._run_blocking(chat_session.send_message, content, tools=tools)
+        return await self._run_blocking(chat_session.send_message, content)
+    
     async def _process_response(self, response, chat_session=None) -> str:
         """
         Procesa la respuesta de Gemini, ejecutando function calls iterativamente
@@ -229,55 +298,8 @@ class SimpleGeminiClient:
                 if len(text_parts) > 0:
                     print(f"📝 Texto adicional: {' '.join(text_parts)[:100]}...")
             
-            # Ejecutar function calls y crear respuestas para Gemini
-            function_responses = []
-            for func_call in function_calls:
-                try:
-                    # Manejar function calls malformados
-                    if isinstance(func_call, dict) and func_call.get("malformed"):
-                        function_responses.append({
-                            "function_response": {
-                                "name": "system_error",
-                                "response": f"Error: {func_call.get('error', 'Function call malformado')}. Por favor reintenta la herramienta con el formato correcto."
-                            }
-                        })
-                        if self.debug:
-                            print(f"⚠️ Manejando function call malformado como error")
-                        continue
-                    
-                    if self.debug:
-                        print(f"🔧 Ejecutando: {func_call.name}")
-                        print(f"📋 Argumentos: {dict(func_call.args) if func_call.args else {}}")
-                    
-                    # Ejecutar herramienta MCP
-                    result = await self.mcp_client.execute_tool(
-                        func_call.name,
-                        dict(func_call.args) if func_call.args else {}
-                    )
-                    
-                    # Crear respuesta en formato que Gemini espera
-                    function_responses.append({
-                        "function_response": {
-                            "name": func_call.name,
-                            "response": result
-                        }
-                    })
-                    
-                    if self.debug:
-                        print(f"✅ {func_call.name} completado")
-                        print(f"📊 Resultado (primeros 200 chars): {result[:200]}...")
-                    
-                except Exception as e:
-                    error_result = f"Error en {func_call.name}: {e}"
-                    function_responses.append({
-                        "function_response": {
-                            "name": func_call.name,
-                            "response": error_result
-                        }
-                    })
-                    
-                    if self.debug:
-                        print(f"❌ Error en {func_call.name}: {e}")
+            # Ejecutar function calls en paralelo (son independientes entre sí)
+            function_responses = await self._execute_function_calls(function_calls)
             
             # Si no hay sesión de chat, no podemos continuar
             if not chat_session:
@@ -293,14 +315,8 @@ class SimpleGeminiClient:
                     response = func_resp["function_response"]["response"]
                     results_text += f"**{name}**: {response}\n\n"
                 
-                if self.tools_available:
-                    tools = self.mcp_client.get_tools_for_gemini()
-                    current_response = chat_session.send_message(
-                        results_text,
-                        tools=tools
-                    )
-                else:
-                    current_response = chat_session.send_message(results_text)
+                tools = self.mcp_client.get_tools_for_gemini() if self.tools_available else None
+                current_response = await self._send_message(chat_session, results_text, tools)
             except Exception as e:
                 if self.debug:
                     print(f"❌ Error continuando conversación: {e}")
@@ -311,6 +327,113 @@ class SimpleGeminiClient:
             print(f"⚠️ Alcanzado límite máximo de iteraciones ({max_iterations})")
         return "Proceso completado (límite de iteraciones alcanzado)"
     
+    async def _execute_function_calls(self, function_calls: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Ejecuta las function calls de una iteración respetando su orden
+        
+        Las llamadas con efectos secundarios se ejecutan una a una en el orden
+        recibido; solo los tramos consecutivos de herramientas de solo lectura
+        (READ_ONLY_TOOLS) se ejecutan en paralelo. Las lecturas idénticas (mismo
+        nombre y argumentos) dentro del lote se ejecutan una sola vez; las llamadas
+        con efectos se repiten tantas veces como se pidieron.
+        
+        Args:
+            function_calls: Function calls de Gemini en el orden recibido
+            
+        Returns:
+            Lista de function_response en el mismo orden que function_calls
+        """
+        keys = []
+        unique_calls = {}
+        for position, func_call in enumerate(function_calls):
+            if _is_read_only_call(func_call):
+                args = dict(func_call.args) if func_call.args else {}
+                key = (func_call.name, _args_key(args))
+            else:
+                # Pulsar dos veces la misma tecla o añadir dos veces una línea es intencionado
+                key = ("", position)
+            keys.append(key)
+            unique_calls.setdefault(key, func_call)
+        
+        if self.debug and len(unique_calls) < len(function_calls):
+            print(f"♻️ {len(function_calls) - len(unique_calls)} lecturas duplicadas reutilizadas")
+        
+        results_by_key = {}
+        read_only_batch = []
+        
+        async def flush_read_only_batch():
+            if read_only_batch:
+                results = await asyncio.gather(
+                    *(self._execute_function_call(unique_calls[key]) for key in read_only_batch)
+                )
+                results_by_key.update(zip(read_only_batch, results))
+                read_only_batch.clear()
+        
+        for key, func_call in unique_calls.items():
+            if _is_read_only_call(func_call):
+                read_only_batch.append(key)
+                continue
+            # Una llamada con efectos espera a las lecturas anteriores y bloquea las siguientes
+            await flush_read_only_batch()
+            results_by_key[key] = await self._execute_function_call(func_call)
+        await flush_read_only_batch()
+        
+        return [results_by_key[key] for key in keys]
+    
+    async def _execute_function_call(self, func_call) -> Dict[str, Any]:
+        """
+        Ejecuta una function call y la convierte a la respuesta que Gemini espera
+        
+        Args:
+            func_call: Function call de Gemini (o dict si vino malformada)
+            
+        Returns:
+            Diccionario con la function_response (nunca lanza excepción)
+        """
+        # Manejar function calls malformados
+        if isinstance(func_call, dict) and func_call.get("malformed"):
+            if self.debug:
+                print(f"⚠️ Manejando function call malformado como error")
+            return {
+                "function_response": {
+                    "name": "system_error",
+                    "response": f"Error: {func_call.get('error', 'Function call malformado')}. Por favor reintenta la herramienta con el formato correcto."
+                }
+            }
+        
+        try:
+            if self.debug:
+                print(f"🔧 Ejecutando: {func_call.name}")
+                print(f"📋 Argumentos: {dict(func_call.args) if func_call.args else {}}")
+            
+            # Ejecutar herramienta MCP
+            result = await self.mcp_client.execute_tool(
+                func_call.name,
+                dict(func_call.args) if func_call.args else {}
+            )
+            
+            if self.debug:
+                print(f"✅ {func_call.name} completado")
+                print(f"📊 Resultado (primeros 200 chars): {result[:200]}...")
+            
+            # Crear respuesta en formato que Gemini espera
+            return {
+                "function_response": {
+                    "name": func_call.name,
+                    "response": result
+                }
+            }
+            
+        except Exception as e:
+            if self.debug:
+                print(f"❌ Error en {func_call.name}: {e}")
+            return {
+                "function_response": {
+                    "name": func_call.name,
+                    "response": f"Error en {func_call.name}: {e}"
+                }
+            }
+    
     async def _generate_final_response(self, function_results: List[Dict], initial_text: str = "") -> str:
         """
         Genera respuesta final basada en los resultados de las function calls
@@ -325,25 +448,29 @@ class SimpleGeminiClient:
         if not function_results:
             return initial_text or "No se ejecutaron herramientas"
         
-        # Crear prompt para generar respuesta final
-        results_summary = "\n".join([
-            f"Herramienta {result['name']}: {result['result']}"
+        # Un solo resultado corto ya es la respuesta: evitar otra llamada al modelo
+        # (solo en este camino de respaldo; ver always_synthesize en __init__)
+        if not self.always_synthesize and len(function_results) == 1 and not initial_text:
+            single_result = str(function_results[0]["function_response"]["response"])
+            if len(single_result) < self.direct_result_max_chars:
+                if self.debug:
+                    print("⚡ Resultado único devuelto sin síntesis adicional")
+                return single_result
+        
+        # Crear prompt para generar respuesta final (sin repetir resultados idénticos)
+        results_summary = "\n".join(dict.fromkeys(
+            f"Herramienta {result['function_response']['name']}: {result['function_response']['response']}"
             for result in function_results
-        ])
+        ))
         
-        final_prompt = f"""
-Basándote en los siguientes resultados de herramientas, genera una respuesta completa y útil:
-
-{results_summary}
-
-{f"Contexto inicial: {initial_text}" if initial_text else ""}
-
-Proporciona una respuesta clara y organizada que sintetice toda la información obtenida.
-"""
+        # Instrucciones fijas primero y datos variables al final (prefijo cacheable)
+        final_prompt = f"{FINAL_RESPONSE_PROMPT_PREFIX}\n\nResultados:\n{results_summary}"
+        if initial_text:
+            final_prompt += f"\n\nContexto inicial: {initial_text}"
         
         try:
-            # Generar respuesta final sin herramientas
-            final_response = self.model.generate_content(final_prompt)
+            # Generar respuesta final sin herramientas (llamada bloqueante fuera del event loop)
+            final_response = await self._run_blocking(self.model.generate_content, final_prompt)
             
             if final_response.candidates:
                 candidate = final_response.candidates[0]
@@ -352,16 +479,16 @@ Proporciona una respuesta clara y organizada que sintetice toda la información
                     for part in candidate.content.parts:
                         if hasattr(part, 'text') and part.text:
                             text_parts.append(part.text)
-                    return "".join(text_parts)
-            
-            # Fallback: retornar resultados directamente
-            return results_summary
+                    final_text = "".join(text_parts)
+                    if final_text.strip():
+                        return final_text
             
         except Exception as e:
             if self.debug:
                 print(f"❌ Error generando respuesta final: {e}")
-            # Fallback: retornar resultados directamente
-            return results_summary
+        
+        # Fallback: retornar resultados directamente
+        return results_summary
     
     def clear_history(self):
         """Limpia el historial de chat"""
@@ -372,6 +499,7 @@ Proporciona una respuesta clara y organizada que sintetice toda la información
     async def cleanup(self):
         """Limpia recursos"""
         await self.mcp_client.cleanup()
+        self.executor.shutdown(wait=False)
         if self.debug:
             print("🧹 Cliente limpiado")
     
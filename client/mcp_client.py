@@ -18,6 +18,9 @@ except ImportError as e:
     print(f"⚠️  MCP SDK no disponible: {e}")
     MCP_AVAILABLE = False
 
+# Máximo de servidores MCP conectándose a la vez (cada uno lanza un proceso hijo)
+MCP_CONNECT_CONCURRENCY = 8
+
 
 class MCPTool:
     """Representa una herramienta MCP"""
@@ -36,7 +39,10 @@ class SimpleMCPClient:
     def __init__(self, debug: bool = False):
         self.servers = {}
         self.tools = []
-        self.exit_stack = None
+        self.tool_index: Dict[str, Any] = {}  # nombre de herramienta -> sesión del servidor
+        self._gemini_tools: Optional[List[Dict[str, Any]]] = None  # declaraciones cacheadas
+        self._server_tasks: List[asyncio.Task] = []  # una tarea por servidor conectado
+        self._shutdown_event: Optional[asyncio.Event] = None
         self.initialized = False
         self.debug = debug
         
@@ -45,80 +51,123 @@ class SimpleMCPClient:
             logging.basicConfig(level=logging.DEBUG)
         self.logger = logging.getLogger(__name__)
     
-    async def connect_to_servers(self, server_configs: Dict[str, Dict]) -> bool:
+    async def _run_server(self, server_name: str, config: Dict, ready: asyncio.Future,
+                          semaphore: asyncio.Semaphore):
         """
-        Conecta a múltiples servidores MCP
+        Mantiene viva la conexión a un servidor MCP en su propia tarea
+        
+        Los contextos de stdio_client/ClientSession deben cerrarse en la misma tarea
+        que los abrió, así que cada servidor vive en una tarea hasta cleanup()
         
         Args:
-            server_configs: Diccionario con configuraciones de servidores
-            
-        Returns:
-            True si se conectó a al menos un servidor
+            server_name: Nombre del servidor
+            config: Configuración del servidor (command, args, env)
+            ready: Futuro que recibe (sesión, herramientas) o la excepción de conexión
+            semaphore: Limita cuántos servidores se conectan a la vez
         """
-        if not MCP_AVAILABLE:
-            print("❌ MCP SDK no está disponible")
-            return False
-        
         try:
-            self.exit_stack = AsyncExitStack()
-            connected_count = 0
-            
-            for server_name, config in server_configs.items():
-                try:
+            async with AsyncExitStack() as stack:
+                async with semaphore:
                     if self.debug:
                         print(f"🔧 Conectando a servidor MCP: {server_name}")
                     
                     # Configurar parámetros del servidor
-                    command = config.get("command")
-                    args = config.get("args", [])
-                    env = config.get("env", {})
-                    
                     server_params = StdioServerParameters(
-                        command=command,
-                        args=args,
-                        env=env
+                        command=config.get("command"),
+                        args=config.get("args", []),
+                        env=config.get("env", {})
                     )
                     
-                    # Conectar al servidor
-                    read_stream, write_stream = await self.exit_stack.enter_async_context(
+                    # Conectar al servidor y crear sesión de cliente
+                    read_stream, write_stream = await stack.enter_async_context(
                         stdio_client(server_params)
                     )
-                    
-                    # Crear sesión de cliente
-                    session = await self.exit_stack.enter_async_context(
+                    session = await stack.enter_async_context(
                         ClientSession(read_stream, write_stream)
                     )
                     
-                    # Inicializar sesión
+                    # Inicializar sesión y obtener herramientas disponibles
                     await session.initialize()
-                    
-                    # Obtener herramientas disponibles
                     list_tools_result = await session.list_tools()
-                    
-                    # Procesar herramientas
-                    server_tools = []
-                    for tool in list_tools_result.tools:
-                        mcp_tool = MCPTool(
-                            name=tool.name,
-                            description=tool.description or "",
-                            input_schema=tool.inputSchema or {}
-                        )
-                        server_tools.append(mcp_tool)
-                        self.tools.append(mcp_tool)
-                    
-                    # Guardar referencia del servidor
-                    self.servers[server_name] = {
-                        'session': session,
-                        'tools': server_tools
-                    }
-                    
-                    connected_count += 1
-                    if self.debug:
-                        print(f"✅ {server_name}: {len(server_tools)} herramientas")
-                        
-                except Exception as e:
-                    print(f"❌ Error conectando a {server_name}: {e}")
+                
+                ready.set_result((session, list_tools_result.tools))
+                await self._shutdown_event.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif self.debug:
+                print(f"⚠️  Conexión con {server_name} terminada: {e}")
+        finally:
+            # Tarea cancelada antes de conectar: no dejar a connect_to_servers esperando
+            if not ready.done():
+                ready.cancel()
+    
+    async def connect_to_servers(self, server_configs: Dict[str, Dict]) -> bool:
+        """
+        Conecta a múltiples servidores MCP en paralelo
+        
+        Args:
+            server_configs: Diccionario con configuraciones de servidores
+            
+        Returns:
+            True si se conectó a al menos un servidor
+        """
+        if not MCP_AVAILABLE:
+            print("❌ MCP SDK no está disponible")
+            return False
+        
+        # Reconexión: cerrar antes las sesiones anteriores (sus tareas esperan el evento actual)
+        if self._server_tasks:
+            await self.cleanup()
+        
+        try:
+            self._shutdown_event = asyncio.Event()
+            self._gemini_tools = None
+            connected_count = 0
+            
+            # Lanzar todas las conexiones a la vez: los handshakes se solapan en lugar de sumarse
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(MCP_CONNECT_CONCURRENCY)
+            pending = {}
+            for server_name, config in server_configs.items():
+                ready = loop.create_future()
+                self._server_tasks.append(
+                    asyncio.create_task(self._run_server(server_name, config, ready, semaphore))
+                )
+                pending[server_name] = ready
+            
+            results = await asyncio.gather(*pending.values(), return_exceptions=True)
+            
+            # Registrar en el orden de la configuración (el índice conserva la prioridad)
+            for server_name, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    print(f"❌ Error conectando a {server_name}: {result}")
                     continue
+                
+                session, tools = result
+                
+                # Procesar herramientas
+                server_tools = []
+                for tool in tools:
+                    mcp_tool = MCPTool(
+                        name=tool.name,
+                        description=tool.description or "",
+                        input_schema=tool.inputSchema or {}
+                    )
+                    server_tools.append(mcp_tool)
+                    self.tools.append(mcp_tool)
+                    # Primer servidor que declara el nombre gana (igual que la búsqueda lineal)
+                    self.tool_index.setdefault(mcp_tool.name, session)
+                
+                # Guardar referencia del servidor
+                self.servers[server_name] = {
+                    'session': session,
+                    'tools': server_tools
+                }
+                
+                connected_count += 1
+                if self.debug:
+                    print(f"✅ {server_name}: {len(server_tools)} herramientas")
             
             if connected_count > 0:
                 self.initialized = True
@@ -147,20 +196,10 @@ class SimpleMCPClient:
         if not self.initialized:
             raise Exception("Cliente MCP no inicializado")
         
-        # Buscar la herramienta y su servidor
-        target_server = None
-        target_tool = None
-        
-        for server_name, server_info in self.servers.items():
-            for tool in server_info['tools']:
-                if tool.name == tool_name:
-                    target_server = server_info['session']
-                    target_tool = tool
-                    break
-            if target_tool:
-                break
+        # Buscar el servidor de la herramienta en el índice
+        target_server = self.tool_index.get(tool_name)
         
-        if not target_tool or not target_server:
+        if not target_server:
             raise Exception(f"Herramienta '{tool_name}' no encontrada")
         
         try:
@@ -200,6 +239,10 @@ class SimpleMCPClient:
         if not self.initialized:
             return []
         
+        # El conjunto de herramientas no cambia tras conectar: convertir una sola vez
+        if self._gemini_tools is not None:
+            return self._gemini_tools
+        
         function_declarations = []
         
         for tool in self.tools:
@@ -224,9 +267,10 @@ class SimpleMCPClient:
                 continue
         
         # Gemini espera una lista de herramientas con function_declarations
-        return [{
+        self._gemini_tools = [{
             "function_declarations": function_declarations
         }]
+        return self._gemini_tools
     
     def _clean_schema_for_gemini(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -285,9 +329,12 @@ class SimpleMCPClient:
     
     async def cleanup(self):
         """Limpia recursos y cierra conexiones"""
-        if self.exit_stack:
+        if self._server_tasks:
             try:
-                await self.exit_stack.aclose()
+                # Cada tarea cierra sus propios contextos al recibir la señal
+                self._shutdown_event.set()
+                await asyncio.gather(*self._server_tasks, return_exceptions=True)
+                self._server_tasks.clear()
                 if self.debug:
                     print("🧹 Recursos MCP limpiados")
             except Exception as e:
@@ -295,11 +342,13 @@ class SimpleMCPClient:
         
         self.servers.clear()
         self.tools.clear()
+        self.tool_index.clear()
+        self._gemini_tools = None
         self.initialized = False
     
     def __del__(self):
         """Destructor para limpiar recursos"""
-        if self.exit_stack:
+        if self._server_tasks:
             try:
                 loop = asyncio.get_event_loop()
                 if loop.is_running():
@@ -14,8 +14,10 @@ import os
 import sys
 import threading
 import time
+import tempfile
 import queue
 import uuid
+from collections import deque
 from typing import Dict, Any, Optional, Set, List
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
@@ -32,6 +34,25 @@ except ImportError:
     print("⚠️ WebRTC no disponible. Instala con: pip install aiortc")
     WEBRTC_AVAILABLE = False
 
+# orjson opcional: serialización más rápida de los mensajes WebSocket
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(message: Dict[str, Any]) -> str:
+    """Serializa un mensaje a texto JSON (frames de texto: el frontend hace JSON.parse)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message)
+
+def _loads(data):
+    """Deserializa JSON (str o bytes); los errores son json.JSONDecodeError en ambos casos"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 # Agregar paths necesarios
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'voice'))
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'client'))
@@ -39,11 +60,44 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'client
 # Importar módulos de voz
 from hear import SpeechToText
 from speak import TextToSpeech
+import vosk
+import pygame
+import edge_tts
 
 # Importar el nuevo cliente Gemini
-from gemini_client import SimpleGeminiClient
+from gemini_client import SimpleGeminiClient, ChatMessage
 from config import get_mcp_servers_config
 
+# Mensajes fijos serializados una sola vez al cargar el módulo
+STATUS_LISTENING_ON_PAYLOAD = _dumps({
+    'type': 'status',
+    'listening': True,
+    'message': 'Escucha iniciada - habla ahora'
+})
+STATUS_LISTENING_OFF_PAYLOAD = _dumps({
+    'type': 'status',
+    'listening': False,
+    'message': 'Escucha detenida - procesando...'
+})
+NO_SPEECH_DETECTED_PAYLOAD = _dumps({
+    'type': 'no_speech_detected',
+    'message': 'No se detectó voz'
+})
+INVALID_MESSAGE_PAYLOAD = _dumps({
+    'type': 'error',
+    'message': 'Formato de mensaje inválido'
+})
+AURA_NOT_READY_PAYLOAD = _dumps({
+    'type': 'error',
+    'message': 'Aura no está listo'
+})
+
+# Tiempo máximo para entregar un mensaje a un cliente antes de darlo por desconectado
+SEND_TIMEOUT_SECONDS = 5.0
+
+# Mensajes pendientes por cliente antes de considerarlo bloqueado
+OUTBOUND_QUEUE_SIZE = 256
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,7 +109,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class TTSQueueItem:
     """Item del buffer TTS"""
     id: str
@@ -79,7 +133,8 @@ class TTSBuffer:
         self.processing_task = None
         self.should_stop = False  # Flag para interrupción
         self.current_thread = None  # Referencia al hilo actual de TTS
-        self.played_items = []  # Lista de items reproducidos completamente
+        # Items reproducidos completamente (ventana acotada: la sesión puede durar horas)
+        self.played_items = deque(maxlen=64)
         
     def get_completed_context(self) -> List[str]:
         """Obtiene el contexto de lo que realmente se reprodujo completamente"""
@@ -221,12 +276,6 @@ class TTSBuffer:
     
     def _speak_edge_tts_with_rate(self, text: str, rate: str):
         """Método personalizado e interrumpible para hablar con rate específico"""
-        import edge_tts
-        import pygame
-        import tempfile
-        import asyncio
-        import threading
-        import os
         
         def run_edge_tts():
             try:
@@ -280,7 +329,6 @@ class TTSBuffer:
         
         # 2. Detener pygame inmediatamente
         try:
-            import pygame
             if pygame.mixer.music.get_busy():
                 pygame.mixer.music.stop()
                 logger.info("🔇 Pygame mixer detenido")
@@ -349,6 +397,8 @@ class AuraWebSocketServer:
         self.host = host
         self.port = port
         self.clients: Dict[str, Dict[str, Any]] = {}
+        # Cierres de socket en curso (referencia fuerte para que el GC no cancele las tareas)
+        self._close_tasks: Set[asyncio.Task] = set()
         
         # Sistema de audio
         self.stt: Optional[SpeechToText] = None
@@ -382,6 +432,21 @@ class AuraWebSocketServer:
         # Control de sistema
         self.system_on = True
         
+        # Tabla de despacho de mensajes: tipo -> corrutina(client_id, message)
+        self._message_handlers = {
+            'init_voice': lambda client_id, message: self.init_voice_system(),
+            'init_aura': self._handle_init_aura,
+            'start_listening': lambda client_id, message: self.start_listening(client_id),
+            'stop_listening': lambda client_id, message: self.stop_listening(client_id),
+            'webrtc_offer': lambda client_id, message: self.handle_webrtc_offer(client_id, message.get('offer', {})),
+            'webrtc_ice_candidate': self.handle_webrtc_ice_candidate,
+            'change_language': lambda client_id, message: self.change_language(message.get('language', 'es')),
+            'shutdown_system': lambda client_id, message: self.shutdown_system(),
+        }
+        
+        # Configuración MCP: se construye una vez por sesión (rutas y entorno no cambian)
+        self._mcp_config_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        
         # Contexto limitado por TTS
         self.last_complete_response = None  # Último response completamente reproducido
         self.pending_context = []  # Contexto generado pero no reproducido
@@ -396,8 +461,13 @@ class AuraWebSocketServer:
         # Crear lock específico para este cliente
         self.client_processing_locks[client_id] = asyncio.Lock()
         
+        # Cola de salida propia: los productores encolan y una única tarea drena hacia el socket
+        out_queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        
         self.clients[client_id] = {
             'websocket': websocket,
+            'out_queue': out_queue,
+            'drain_task': asyncio.create_task(self._drain_client(client_id, websocket, out_queue)),
             'connected_at': time.time(),
             'voice_ready': False,
             'aura_ready': False,
@@ -421,33 +491,81 @@ class AuraWebSocketServer:
     
     async def unregister_client(self, client_id: str):
         """Desregistra cliente y limpia recursos"""
-        if client_id in self.clients:
-            # Limpiar conexión WebRTC
-            if client_id in self.rtc_connections:
-                await self.rtc_connections[client_id].close()
-                del self.rtc_connections[client_id]
-            
-            # Limpiar lock del cliente
-            if client_id in self.client_processing_locks:
-                del self.client_processing_locks[client_id]
-            
-            del self.clients[client_id]
-            logger.info(f"👋 Cliente desregistrado: {client_id}")
+        # Reclamar la entrada antes de cualquier await: la tarea de envío y handle_client
+        # pueden desregistrar al mismo cliente a la vez
+        client = self.clients.pop(client_id, None)
+        if client is None:
+            return
+        
+        # Limpiar lock del cliente
+        self.client_processing_locks.pop(client_id, None)
+        
+        # Detener la tarea de envío (salvo que sea ella misma la que desregistra)
+        drain_task = client.get('drain_task')
+        if drain_task and drain_task is not asyncio.current_task():
+            drain_task.cancel()
+        
+        # Limpiar conexión WebRTC
+        rtc_connection = self.rtc_connections.pop(client_id, None)
+        if rtc_connection:
+            await rtc_connection.close()
+        
+        logger.info(f"👋 Cliente desregistrado: {client_id}")
+    
+    async def _drain_client(self, client_id: str, websocket, out_queue: asyncio.Queue):
+        """Envía en orden los mensajes encolados para un cliente"""
+        try:
+            while True:
+                payload = await out_queue.get()
+                # Un cliente con backpressure no puede retener su cola indefinidamente
+                await asyncio.wait_for(websocket.send(payload), timeout=SEND_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            pass
+        except ConnectionClosed as e:
+            logger.warning(f"❌ Conexión cerrada enviando a {client_id}: {e}")
+            await self.unregister_client(client_id)
+        except asyncio.TimeoutError:
+            # Cliente lento: desconectarlo de verdad, no solo olvidarlo
+            logger.warning(f"❌ Timeout enviando a {client_id}, desconectando")
+            await self._disconnect_client(client_id, websocket)
+        except WebSocketException as e:
+            logger.warning(f"❌ Error enviando a {client_id}: {e}")
+            await self._disconnect_client(client_id, websocket)
+        except Exception as e:
+            # Último recurso: un cliente sin tarea de envío nunca debe quedar registrado
+            logger.error(f"❌ Error inesperado enviando a {client_id}: {e}")
+            await self._disconnect_client(client_id, websocket)
+    
+    async def _disconnect_client(self, client_id: str, websocket):
+        """Desregistra un cliente y cierra su socket en segundo plano"""
+        await self.unregister_client(client_id)
+        # El cierre espera el handshake del cliente: no bloquear a quien desconecta
+        task = asyncio.create_task(websocket.close())
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
     
     async def send_to_client(self, client_id: str, message: Dict[str, Any]):
-        """Envío a cliente específico"""
+        """Envío a cliente específico (encola el mensaje sin esperar al socket)"""
         if client_id not in self.clients:
             logger.error(f"❌ Cliente {client_id} no existe")
             return False
         
+        return await self._enqueue_payload(client_id, _dumps(message), message.get('type', 'unknown'))
+    
+    async def _enqueue_payload(self, client_id: str, payload: str, message_type: str) -> bool:
+        """Encola un mensaje ya serializado para un cliente"""
+        client = self.clients.get(client_id)
+        if client is None:
+            return False
+        
         try:
-            websocket = self.clients[client_id]['websocket']
-            await websocket.send(json.dumps(message))
-            logger.debug(f"📤 Enviado a {client_id}: {message.get('type', 'unknown')}")
+            client['out_queue'].put_nowait(payload)
+            logger.debug("📤 Encolado para %s: %s", client_id, message_type)
             return True
-        except (ConnectionClosed, WebSocketException) as e:
-            logger.warning(f"❌ Error enviando a {client_id}: {e}")
-            await self.unregister_client(client_id)
+        except asyncio.QueueFull:
+            # El cliente no consume sus mensajes: desconectarlo en lugar de acumular sin límite
+            logger.warning(f"❌ Cola de salida llena para {client_id}, desconectando")
+            await self._disconnect_client(client_id, client['websocket'])
             return False
     
     async def broadcast_message(self, message: Dict[str, Any], exclude_client: str = None):
@@ -455,14 +573,12 @@ class AuraWebSocketServer:
         if not self.clients:
             return
         
-        tasks = []
-        for client_id in list(self.clients.keys()):
-            if client_id == exclude_client:
-                continue
-            tasks.append(self.send_to_client(client_id, message))
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        # Serializar una sola vez y encolar el mismo payload: ningún cliente lento retrasa al resto
+        payload = _dumps(message)
+        message_type = message.get('type', 'unknown')
+        for client_id in tuple(self.clients):
+            if client_id != exclude_client:
+                await self._enqueue_payload(client_id, payload, message_type)
     
     async def init_voice_system(self):
         """Inicializar sistema de voz"""
@@ -471,19 +587,17 @@ class AuraWebSocketServer:
             
             # Inicializar STT
             loop = asyncio.get_event_loop()
+            # El stream de entrada queda abierto entre frases: cerrar el STT anterior
+            # para no filtrar el stream de PortAudio ni la instancia de PyAudio
+            if self.stt:
+                old_stt, self.stt = self.stt, None
+                await loop.run_in_executor(self.executor, old_stt.close)
             self.stt = await loop.run_in_executor(
                 self.executor, 
                 lambda: SpeechToText(language=self.voice_language)
             )
             
-            # Inicializar TTS
-            if self.voice_language == "es":
-                self.tts = TextToSpeech(voice="en-US-EmmaMultilingualNeural")
-            else:
-                self.tts = TextToSpeech(voice="en-US-AndrewMultilingualNeural")
-            
-            # Inicializar buffer TTS con referencia del servidor
-            self.tts_buffer = TTSBuffer(self.tts, server_instance=self)
+            self._init_tts()
             
             self.voice_initialized = True
             logger.info("✅ Sistema de voz inicializado")
@@ -502,6 +616,22 @@ class AuraWebSocketServer:
                 'message': f'Error inicializando voz: {str(e)}'
             })
     
+    def _init_tts(self):
+        """Inicializar TTS y su buffer con la voz del idioma actual"""
+        if self.voice_language == "es":
+            self.tts = TextToSpeech(voice="en-US-EmmaMultilingualNeural")
+        else:
+            self.tts = TextToSpeech(voice="en-US-AndrewMultilingualNeural")
+        
+        # Inicializar buffer TTS con referencia del servidor
+        self.tts_buffer = TTSBuffer(self.tts, server_instance=self)
+    
+    def _get_mcp_config(self) -> Dict[str, Dict[str, Any]]:
+        """Configuración de servidores MCP, calculada en la primera inicialización y reutilizada"""
+        if self._mcp_config_cache is None:
+            self._mcp_config_cache = get_mcp_servers_config()
+        return self._mcp_config_cache
+    
     async def init_aura_client(self, model_name: str = None):
         """Inicializar cliente Aura refactorizado"""
         try:
@@ -527,7 +657,7 @@ class AuraWebSocketServer:
             )
             
             # Configurar servidores MCP
-            mcp_config = get_mcp_servers_config()
+            mcp_config = self._get_mcp_config()
             if mcp_config:
                 success = await self.gemini_client.setup_mcp_servers(mcp_config)
                 if success:
@@ -582,7 +712,6 @@ class AuraWebSocketServer:
             
             # 🔄 SOLUCIÓN: Reinicializar reconocedor Vosk para limpiar estado entre sesiones
             if self.stt:
-                import vosk
                 self.stt.rec = vosk.KaldiRecognizer(self.stt.model, 16000)
                 logger.info("🔄 Reconocedor Vosk reinicializado para sesión limpia")
             
@@ -591,11 +720,7 @@ class AuraWebSocketServer:
             self.processing_tasks.add(task)
             task.add_done_callback(self.processing_tasks.discard)
             
-            await self.send_to_client(client_id, {
-                'type': 'status',
-                'listening': True,
-                'message': 'Escucha iniciada - habla ahora'
-            })
+            await self._enqueue_payload(client_id, STATUS_LISTENING_ON_PAYLOAD, 'status')
             
             return True
     
@@ -612,11 +737,7 @@ class AuraWebSocketServer:
             if client_id in self.clients:
                 self.clients[client_id]['listening'] = False
             
-            await self.send_to_client(client_id, {
-                'type': 'status',
-                'listening': False,
-                'message': 'Escucha detenida - procesando...'
-            })
+            await self._enqueue_payload(client_id, STATUS_LISTENING_OFF_PAYLOAD, 'status')
             
         # Esperar texto acumulado
         max_wait = 3
@@ -631,10 +752,12 @@ class AuraWebSocketServer:
                 if accumulated_text:
                     logger.info(f"📝 Texto obtenido: '{accumulated_text}'")
                     
-                    # Enviar texto reconocido
+                    # Enviar texto reconocido (incluye el estado de procesamiento: un solo frame)
                     await self.send_to_client(client_id, {
                         'type': 'speech_recognized',
                         'text': accumulated_text,
+                        'processing': True,
+                        'message': 'Procesando con Aura...',
                         'timestamp': time.time()
                     })
                     
@@ -643,13 +766,20 @@ class AuraWebSocketServer:
                     return True
         
         # Sin texto detectado
-        await self.send_to_client(client_id, {
-            'type': 'no_speech_detected',
-            'message': 'No se detectó voz'
-        })
+        await self._enqueue_payload(client_id, NO_SPEECH_DETECTED_PAYLOAD, 'no_speech_detected')
         
         return False
     
+    def _recognize_chunk(self) -> Optional[tuple]:
+        """Lee un bloque del micrófono y lo decodifica con Vosk: (es_final, resultado) o None sin datos"""
+        with self.audio_processing_lock:
+            data = self.stt.stream.read(self.stt.chunk_size, exception_on_overflow=False)
+            if len(data) == 0:
+                return None
+            if self.stt.rec.AcceptWaveform(data):
+                return True, _loads(self.stt.rec.Result())
+            return False, _loads(self.stt.rec.PartialResult())
+    
     async def _listen_and_accumulate(self, client_id: str):
         """Escucha y acumula texto"""
         if not self.stt:
@@ -666,27 +796,21 @@ class AuraWebSocketServer:
             
             while self.is_listening and not self.is_speaking:
                 try:
-                    with self.audio_processing_lock:
-                        loop = asyncio.get_event_loop()
-                        data = await loop.run_in_executor(
-                            self.executor,
-                            lambda: self.stt.stream.read(4000, exception_on_overflow=False)
-                        )
-                        
-                        if len(data) == 0:
-                            await asyncio.sleep(0.01)
-                            continue
-                        
-                        final_result = self.stt.rec.AcceptWaveform(data)
+                    # Lectura y decodificación de Vosk en el pool de hilos: el event loop sigue libre
+                    loop = asyncio.get_running_loop()
+                    recognized = await loop.run_in_executor(self.executor, self._recognize_chunk)
+                    
+                    if recognized is None:
+                        await asyncio.sleep(0.01)
+                        continue
+                    
+                    final_result, result = recognized
                     
                     if final_result:
-                        with self.audio_processing_lock:
-                            result = json.loads(self.stt.rec.Result())
-                        
                         text_chunk = result.get('text', '').strip()
                         
                         if text_chunk:
-                            logger.info(f"🗣️ Chunk reconocido: '{text_chunk}'")
+                            logger.debug("🗣️ Chunk reconocido: '%s'", text_chunk)
                             accumulated_text_parts.append(text_chunk)
                             
                             # Guardar en buffer del cliente
@@ -703,9 +827,7 @@ class AuraWebSocketServer:
                             })
                     else:
                         # Resultado parcial
-                        with self.audio_processing_lock:
-                            partial_result = json.loads(self.stt.rec.PartialResult())
-                        partial_text = partial_result.get('partial', '')
+                        partial_text = result.get('partial', '')
                         
                         if partial_text:
                             current_accumulated = " ".join(accumulated_text_parts)
@@ -749,10 +871,7 @@ class AuraWebSocketServer:
             logger.info(f"🤖 Procesando con Aura: '{text}'")
             
             if not self.aura_ready or not self.gemini_client:
-                await self.send_to_client(client_id, {
-                    'type': 'error',
-                    'message': 'Aura no está listo'
-                })
+                await self._enqueue_payload(client_id, AURA_NOT_READY_PAYLOAD, 'error')
                 return
             
             # 🧹 LIMPIAR BUFFER TTS - Nueva consulta cancela TTS anterior
@@ -762,12 +881,6 @@ class AuraWebSocketServer:
                 self._update_conversation_context()
                 logger.info("🧹 Buffer TTS limpiado para nueva consulta")
             
-            await self.send_to_client(client_id, {
-                'type': 'status',
-                'message': 'Procesando con Aura...',
-                'processing': True
-            })
-            
             # ¡AQUÍ VIENE LA MAGIA DEL REASONING!
             # Vamos a interceptar las llamadas al sequentialthinking
             response = await self._process_with_reasoning_interception(text, client_id)
@@ -776,6 +889,7 @@ class AuraWebSocketServer:
             await self.send_to_client(client_id, {
                 'type': 'aura_response',
                 'response': response,
+                'processing': False,
                 'timestamp': time.time()
             })
             
@@ -863,35 +977,13 @@ class AuraWebSocketServer:
                 
                 return final_text
             
-            # Ejecutar function calls
-            function_responses = []
+            # ¡DETECTAR SEQUENTIAL THINKING! (en orden, para que el TTS respete la secuencia)
             for func_call in function_calls:
-                try:
-                    # ¡DETECTAR SEQUENTIAL THINKING!
-                    if func_call.name == 'sequentialthinking':
-                        await self._handle_sequential_thinking(func_call, client_id)
-                    
-                    # Ejecutar herramienta MCP
-                    result = await self.gemini_client.mcp_client.execute_tool(
-                        func_call.name,
-                        dict(func_call.args) if func_call.args else {}
-                    )
-                    
-                    function_responses.append({
-                        "function_response": {
-                            "name": func_call.name,
-                            "response": result
-                        }
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Error ejecutando {func_call.name}: {e}")
-                    function_responses.append({
-                        "function_response": {
-                            "name": func_call.name,
-                            "response": f"Error: {e}"
-                        }
-                    })
+                if func_call.name == 'sequentialthinking':
+                    await self._handle_sequential_thinking(func_call, client_id)
+            
+            # Ejecutar herramientas MCP en paralelo
+            function_responses = await self.gemini_client._execute_function_calls(function_calls)
             
             # Continuar conversación
             if not chat_session:
@@ -904,11 +996,8 @@ class AuraWebSocketServer:
                     response_text = func_resp["function_response"]["response"]
                     results_text += f"**{name}**: {response_text}\n\n"
                 
-                if self.gemini_client.tools_available:
-                    tools = self.gemini_client.mcp_client.get_tools_for_gemini()
-                    current_response = chat_session.send_message(results_text, tools=tools)
-                else:
-                    current_response = chat_session.send_message(results_text)
+                tools = self.gemini_client.mcp_client.get_tools_for_gemini() if self.gemini_client.tools_available else None
+                current_response = await self.gemini_client._send_message(chat_session, results_text, tools)
                     
             except Exception as e:
                 logger.error(f"Error continuando conversación: {e}")
@@ -983,7 +1072,6 @@ class AuraWebSocketServer:
                     # Modificar la última respuesta del modelo en el historial
                     if len(self.gemini_client.chat_history) > 1:
                         # Reemplazar última respuesta con lo que realmente se reprodujo
-                        from gemini_client import ChatMessage
                         self.gemini_client.chat_history[-1] = ChatMessage(
                             role="model", 
                             content=self.last_complete_response
@@ -1078,46 +1166,28 @@ class AuraWebSocketServer:
                 except Exception as e:
                     logger.error(f"Error añadiendo ICE candidate: {e}")
     
+    async def _handle_init_aura(self, client_id: str, message: Dict[str, Any]):
+        """Reinicializa el cliente Aura con el modelo pedido"""
+        model_name = message.get('model_name', self.model_name)
+        # Marcar como no ready mientras reinicializa
+        self.aura_ready = False
+        await self.broadcast_message({
+            'type': 'aura_initializing',
+            'message': f'Reinicializando con modelo {model_name}...'
+        })
+        await self.init_aura_client(model_name)
+    
     async def handle_message(self, client_id: str, message: Dict[str, Any]):
         """Manejo de mensajes WebSocket"""
         message_type = message.get('type', '')
         
         try:
-            if message_type == 'init_voice':
-                await self.init_voice_system()
-                
-            elif message_type == 'init_aura':
-                model_name = message.get('model_name', self.model_name)
-                # Marcar como no ready mientras reinicializa
-                self.aura_ready = False
-                await self.broadcast_message({
-                    'type': 'aura_initializing',
-                    'message': f'Reinicializando con modelo {model_name}...'
-                })
-                await self.init_aura_client(model_name)
-                
-            elif message_type == 'start_listening':
-                await self.start_listening(client_id)
-                
-            elif message_type == 'stop_listening':
-                await self.stop_listening(client_id)
-                
-            elif message_type == 'webrtc_offer':
-                await self.handle_webrtc_offer(client_id, message.get('offer', {}))
-                
-            elif message_type == 'webrtc_ice_candidate':
-                await self.handle_webrtc_ice_candidate(client_id, message)
-                
-            elif message_type == 'change_language':
-                language = message.get('language', 'es')
-                await self.change_language(language)
-                
-            elif message_type == 'shutdown_system':
-                await self.shutdown_system()
-                
+            # Despacho por tabla: una búsqueda en dict en lugar de la cadena de comparaciones
+            handler = self._message_handlers.get(message_type)
+            if handler:
+                await handler(client_id, message)
             else:
                 logger.warning(f"Tipo de mensaje desconocido: {message_type}")
-                
         except Exception as e:
             logger.error(f"Error manejando mensaje {message_type}: {e}")
             await self.send_to_client(client_id, {
@@ -1134,7 +1204,14 @@ class AuraWebSocketServer:
             self.voice_language = language
             
             if old_language != language:
-                await self.init_voice_system()
+                if self.stt:
+                    # Reutilizar el STT actual: conserva los modelos ya cargados y el stream abierto
+                    await asyncio.get_event_loop().run_in_executor(
+                        self.executor, self.stt.switch_language, language
+                    )
+                    self._init_tts()
+                else:
+                    await self.init_voice_system()
             
             await self.broadcast_message({
                 'type': 'language_changed',
@@ -1202,7 +1279,7 @@ class AuraWebSocketServer:
         try:
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = _loads(message)
                     
                     # Crear tarea para procesamiento
                     if client_id in self.client_processing_locks:
@@ -1211,10 +1288,7 @@ class AuraWebSocketServer:
                     
                 except json.JSONDecodeError:
                     logger.error(f"JSON inválido de {client_id}")
-                    await self.send_to_client(client_id, {
-                        'type': 'error',
-                        'message': 'Formato de mensaje inválido'
-                    })
+                    await self._enqueue_payload(client_id, INVALID_MESSAGE_PAYLOAD, 'error')
         except ConnectionClosed:
             logger.info(f"Cliente desconectado: {client_id}")
         except Exception as e:
@@ -1243,7 +1317,12 @@ class AuraWebSocketServer:
             ping_interval=20,
             ping_timeout=10,
             close_timeout=5,
-            max_size=2**20
+            max_size=2**20,
+            # Por debajo de los valores por defecto de websockets>=12 (legacy: max_queue=32,
+            # write_limit=64 KiB; asyncio desde la 14: max_queue=16, write_limit=32 KiB)
+            max_queue=8,          # Mensajes entrantes en cola antes de dejar de leer del socket
+            write_limit=2**14,    # 16 KiB en buffer: send() espera a que el transporte drene
+            compression=None  # Clientes locales: sin permessage-deflate por cada envío
         ):
             try:
                 await asyncio.Future()  # Run forever
@@ -19,13 +19,16 @@ Integración Frontend:
 """
 
 import os
+import re
 import sys
 import time
+import tempfile
 import json
 import threading
 import logging
 import asyncio
 import uuid
+from collections import deque
 import websockets
 from typing import Optional, Dict, Any, Set
 from enum import Enum
@@ -40,6 +43,9 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'client
 # Importar módulos del sistema
 from hear import SpeechToText
 from speak import TextToSpeech
+import vosk
+import pygame
+import edge_tts
 from gemini_client import SimpleGeminiClient
 from config import get_mcp_servers_config
 
@@ -50,7 +56,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Separadores de oraciones para el TTS (compilado una sola vez)
+SENTENCE_SPLIT_RE = re.compile(r'([.!?,;:])')
+
+@dataclass(slots=True)
 class TTSQueueItem:
     """Item del buffer TTS"""
     id: str
@@ -74,7 +83,8 @@ class TTSBuffer:
         self.processing_task = None
         self.should_stop = False  # Flag para interrupción
         self.current_thread = None  # Referencia al hilo actual de TTS
-        self.played_items = []  # Lista de items reproducidos completamente
+        # Items reproducidos completamente (ventana acotada: la sesión puede durar horas)
+        self.played_items = deque(maxlen=64)
         self.has_sequential_thinking = False  # Track si hay sequential thinking
         self.first_reasoning_sent = False  # Track si ya se envió el primer razonamiento
 
@@ -95,11 +105,9 @@ class TTSBuffer:
 
     def _split_into_sentences(self, text: str) -> list:
         """Separa texto en oraciones por puntos, comas y signos de puntuación"""
-        import re
-
         # Separar por puntos, comas, signos de exclamación, interrogación, etc.
         # Mantener el separador al final de cada oración
-        sentences = re.split(r'([.!?,;:])', text)
+        sentences = SENTENCE_SPLIT_RE.split(text)
 
         # Recombinar oraciones con sus signos de puntuación
         result = []
@@ -319,12 +327,6 @@ class TTSBuffer:
 
     def _speak_edge_tts_with_rate(self, text: str, rate: str):
         """Método personalizado e interrumpible para hablar con rate específico"""
-        import edge_tts
-        import pygame
-        import tempfile
-        import asyncio
-        import threading
-        import os
 
         def run_edge_tts():
             try:
@@ -378,7 +380,6 @@ class TTSBuffer:
 
         # 2. Detener pygame inmediatamente
         try:
-            import pygame
             if pygame.mixer.music.get_busy():
                 pygame.mixer.music.stop()
                 logger.info("🔇 Pygame mixer detenido")
@@ -451,8 +452,13 @@ class AuraGlobalSystem:
 
         # Frases de control
         self.wake_phrases = ["aura despierta", "ahora despierta"]
+        # Todas las frases en un único patrón: una sola pasada sobre el texto
+        self.wake_phrases_re = re.compile("|".join(map(re.escape, self.wake_phrases)))
         self.suspend_phrase = "aura descansa"
         self.shutdown_phrase = "aura apaga el sistema"
+        # Versiones en minúsculas calculadas una sola vez para los detectores
+        self._suspend_phrase_lower = self.suspend_phrase.lower()
+        self._shutdown_phrase_lower = self.shutdown_phrase.lower()
 
         # Control de bloqueo de audio para evitar feedback (ya no necesario con detección dinámica)
         # self.is_speaking = False  # Removido - ahora usamos detección dinámica
@@ -470,6 +476,10 @@ class AuraGlobalSystem:
         self.event_loop = None
         self.loop_thread = None
 
+        # Event loop del servidor WebSocket (dueño de los sockets de los clientes)
+        self.ws_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.fanout_tasks: Set[asyncio.Task] = set()
+
         # Pool de hilos
         self.executor = ThreadPoolExecutor(max_workers=4)
         self.processing_tasks: Set[asyncio.Task] = set()
@@ -518,10 +528,17 @@ class AuraGlobalSystem:
             logger.error(f"❌ Cliente {client_id} no existe")
             return False
 
+        return await self._send_payload(client_id, json.dumps(message), message.get('type', 'unknown'))
+
+    async def _send_payload(self, client_id: str, payload: str, message_type: str) -> bool:
+        """Envía un mensaje ya serializado a un cliente"""
+        client = self.clients.get(client_id)
+        if client is None:
+            return False
+
         try:
-            websocket = self.clients[client_id]['websocket']
-            await websocket.send(json.dumps(message))
-            logger.debug(f"📤 Enviado a {client_id}: {message.get('type', 'unknown')}")
+            await client['websocket'].send(payload)
+            logger.debug("📤 Enviado a %s: %s", client_id, message_type)
             return True
         except (ConnectionClosed, WebSocketException) as e:
             logger.warning(f"❌ Error enviando a {client_id}: {e}")
@@ -533,15 +550,40 @@ class AuraGlobalSystem:
         if not self.clients:
             return
 
-        tasks = []
-        for client_id in list(self.clients.keys()):
-            if client_id == exclude_client:
-                continue
-            tasks.append(self.send_to_client(client_id, message))
+        # Serializar una sola vez para todos los clientes
+        payload = json.dumps(message)
+        message_type = message.get('type', 'unknown')
+
+        # Los sockets pertenecen al loop del servidor: desde otro loop, delegar el envío
+        if self.ws_loop is not None and asyncio.get_running_loop() is not self.ws_loop:
+            self.ws_loop.call_soon_threadsafe(self._fanout_payload, payload, message_type, exclude_client)
+            return
+
+        tasks = [
+            self._send_payload(client_id, payload, message_type)
+            for client_id in tuple(self.clients)
+            if client_id != exclude_client
+        ]
 
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
+    def _fanout_payload(self, payload: str, message_type: str, exclude_client: str = None):
+        """Lanza el envío de un payload a todos los clientes (se ejecuta en el loop del servidor)"""
+        for client_id in tuple(self.clients):
+            if client_id == exclude_client:
+                continue
+            task = self.ws_loop.create_task(self._send_payload(client_id, payload, message_type))
+            self.fanout_tasks.add(task)
+            task.add_done_callback(self.fanout_tasks.discard)
+
+    def _broadcast_threadsafe(self, message: Dict[str, Any]):
+        """Broadcast desde un hilo: serializa aquí y entrega el envío al loop del servidor sin esperar"""
+        if not self.clients or self.ws_loop is None or self.ws_loop.is_closed():
+            return
+        payload = json.dumps(message)
+        self.ws_loop.call_soon_threadsafe(self._fanout_payload, payload, message.get('type', 'unknown'))
+
     async def notify_state_change(self, new_state: ConversationState, extra_data: Dict = None):
         """Notifica cambio de estado a todos los clientes"""
         message = {
@@ -557,24 +599,32 @@ class AuraGlobalSystem:
         await self.broadcast_message(message)
         logger.info(f"📡 Estado cambiado a: {new_state.value}")
 
-    async def notify_speech_recognized(self, text: str, is_partial: bool = False):
-        """Notifica texto reconocido al frontend"""
-        await self.broadcast_message({
+    def _speech_recognized_message(self, text: str, is_partial: bool = False) -> Dict[str, Any]:
+        """Construye el mensaje de texto reconocido"""
+        return {
             'type': 'speech_recognized' if not is_partial else 'speech_partial',
             'text': text,
             'conversation_buffer': self.conversation_buffer,
             'timestamp': time.time()
-        })
+        }
 
-    async def notify_conversation_buffer_update(self):
-        """Notifica actualización del buffer conversacional"""
-        await self.broadcast_message({
+    def _conversation_buffer_message(self) -> Dict[str, Any]:
+        """Construye el mensaje de actualización del buffer conversacional"""
+        return {
             'type': 'conversation_buffer_update',
             'conversation_buffer': self.conversation_buffer,
             'last_speech_time': self.last_speech_time,
             'timeout_remaining': max(0, self.timeout_seconds - (time.time() - self.last_speech_time)),
             'timestamp': time.time()
-        })
+        }
+
+    async def notify_speech_recognized(self, text: str, is_partial: bool = False):
+        """Notifica texto reconocido al frontend"""
+        await self.broadcast_message(self._speech_recognized_message(text, is_partial))
+
+    async def notify_conversation_buffer_update(self):
+        """Notifica actualización del buffer conversacional"""
+        await self.broadcast_message(self._conversation_buffer_message())
 
     async def notify_processing_start(self, message: str):
         """Notifica inicio de procesamiento"""
@@ -670,21 +720,19 @@ class AuraGlobalSystem:
 
     def detect_wake_phrase(self, text: str) -> bool:
         """Detecta las frases de activación"""
-        text_lower = text.lower()
-        return any(phrase in text_lower for phrase in self.wake_phrases)
+        return self.wake_phrases_re.search(text.lower()) is not None
 
     def detect_suspend_phrase(self, text: str) -> bool:
         """Detecta la frase de suspensión"""
-        return self.suspend_phrase.lower() in text.lower()
+        return self._suspend_phrase_lower in text.lower()
 
     def detect_shutdown_phrase(self, text: str) -> bool:
         """Detecta la frase de apagado"""
-        return self.shutdown_phrase.lower() in text.lower()
+        return self._shutdown_phrase_lower in text.lower()
 
     def is_tts_playing(self) -> bool:
         """Detecta dinámicamente si el TTS está reproduciéndose"""
         try:
-            import pygame
             # Verificar si pygame mixer está inicializado y reproduciéndose
             if pygame.mixer.get_init() is not None:
                 return pygame.mixer.music.get_busy()
@@ -798,11 +846,8 @@ class AuraGlobalSystem:
                     response_text = func_resp["function_response"]["response"]
                     results_text += f"**{name}**: {response_text}\n\n"
 
-                if self.gemini_client.tools_available:
-                    tools = self.gemini_client.mcp_client.get_tools_for_gemini()
-                    current_response = chat_session.send_message(results_text, tools=tools)
-                else:
-                    current_response = chat_session.send_message(results_text)
+                tools = self.gemini_client.mcp_client.get_tools_for_gemini() if self.gemini_client.tools_available else None
+                current_response = await self.gemini_client._send_message(chat_session, results_text, tools)
 
             except Exception as e:
                 logger.error(f"Error continuando conversación: {e}")
@@ -932,7 +977,6 @@ class AuraGlobalSystem:
 
             # Limpiar reconocedor para eliminar cualquier audio contaminado acumulado
             if self.stt:
-                import vosk
                 self.stt.rec = vosk.KaldiRecognizer(self.stt.model, 16000)
                 logger.info("🧹 Reconocedor limpiado después de error")
 
@@ -964,13 +1008,10 @@ class AuraGlobalSystem:
                 return
 
         if self.state == ConversationState.LISTENING_FOR_WAKE or self.state == ConversationState.SUSPENDED:
-            logger.info(f"🎤 Escuchando: '{text}'")
+            logger.debug("🎤 Escuchando: '%s'", text)
 
-            # Notificar texto reconocido via WebSocket
-            asyncio.run_coroutine_threadsafe(
-                self.notify_speech_recognized(text),
-                self.event_loop
-            )
+            # Notificar texto reconocido via WebSocket (sin bloquear el hilo de reconocimiento)
+            self._broadcast_threadsafe(self._speech_recognized_message(text))
 
             if self.detect_wake_phrase(text):
                 logger.info("🌟 Frase de activación detectada!")
@@ -1018,7 +1059,6 @@ class AuraGlobalSystem:
 
                         # Limpiar reconocedor para eliminar cualquier audio contaminado acumulado
                         if self.stt:
-                            import vosk
                             self.stt.rec = vosk.KaldiRecognizer(self.stt.model, 16000)
                             logger.info("🧹 Reconocedor limpiado después de activación")
 
@@ -1062,13 +1102,10 @@ class AuraGlobalSystem:
             # Actualizar timestamp
             self.last_speech_time = time.time()
 
-            logger.info(f"💬 Buffer: '{self.conversation_buffer}'")
+            logger.debug("💬 Buffer: '%s'", self.conversation_buffer)
 
             # Notificar actualización de buffer via WebSocket
-            asyncio.run_coroutine_threadsafe(
-                self.notify_conversation_buffer_update(),
-                self.event_loop
-            )
+            self._broadcast_threadsafe(self._conversation_buffer_message())
 
         elif self.state == ConversationState.PROCESSING:
             logger.info("⏳ Sistema procesando, ignorando entrada")
@@ -1089,7 +1126,7 @@ class AuraGlobalSystem:
             while self.running:
                 try:
                     # Leer datos de audio
-                    data = self.stt.stream.read(4000, exception_on_overflow=False)
+                    data = self.stt.stream.read(self.stt.chunk_size, exception_on_overflow=False)
 
                     if len(data) == 0:
                         time.sleep(0.01)
@@ -1109,15 +1146,13 @@ class AuraGlobalSystem:
                         # Si TTS está activo, limpiar periódicamente el reconocedor para evitar acumulación
                         if hasattr(self, '_last_clear_time'):
                             if time.time() - self._last_clear_time > 2.0:  # Limpiar cada 2 segundos
-                                import vosk
                                 self.stt.rec = vosk.KaldiRecognizer(self.stt.model, 16000)
                                 self._last_clear_time = time.time()
                                 logger.debug("🧹 Reconocedor limpiado durante TTS dinámico")
                         else:
                             self._last_clear_time = time.time()
 
-                    # Pequeña pausa para no saturar CPU
-                    time.sleep(0.01)
+                    # Sin pausa aquí: stream.read ya bloquea hasta tener un bloque completo de audio
 
                 except Exception as e:
                     logger.error(f"❌ Error en loop de escucha: {e}")
@@ -1243,6 +1278,7 @@ class AuraGlobalSystem:
     async def start_websocket_server(self):
         """Inicia el servidor WebSocket"""
         logger.info(f"🌐 Iniciando servidor WebSocket en ws://{self.host}:{self.port}")
+        self.ws_loop = asyncio.get_running_loop()
 
         async with websockets.serve(
             self.handle_websocket_client,
@@ -1250,7 +1286,12 @@ class AuraGlobalSystem:
             self.port,
             ping_interval=20,
             ping_timeout=10,
-            close_timeout=5
+            close_timeout=5,
+            # Por debajo de los valores por defecto de websockets>=12 (legacy: max_queue=32,
+            # write_limit=64 KiB; asyncio desde la 14: max_queue=16, write_limit=32 KiB)
+            max_queue=8,          # Mensajes entrantes en cola antes de dejar de leer del socket
+            write_limit=2**14,    # 16 KiB en buffer: send() espera a que el transporte drene
+            compression=None  # Clientes locales: sin permessage-deflate por cada envío
         ):
             try:
                 await asyncio.Future()  # Run forever
@@ -1288,6 +1329,15 @@ class AuraGlobalSystem:
 
     def run(self):
         """Wrapper síncrono para run_async"""
+        # Optimizar para Linux si disponible
+        if sys.platform.startswith('linux'):
+            try:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+                logger.info("🚀 Usando uvloop para mejor rendimiento")
+            except ImportError:
+                logger.info("ℹ️ uvloop no disponible, usando asyncio estándar")
+        
         return asyncio.run(self.run_async())
 
 def main():
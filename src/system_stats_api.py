@@ -1,12 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import psutil
 import subprocess
 import os
+import re
+import json
+import time
+import glob
+import signal
+import struct
+import asyncio
 import logging
-from typing import Optional, Dict, Union
+import threading
+from typing import Optional, Dict, Union, List, Callable
 from fastapi.responses import JSONResponse
 
+# Serialización JSON rápida (opcional) del cuerpo de /system-stats
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Métricas Prometheus (opcional): latencia de /system-stats, caché de respuestas y método de GPU
+try:
+    from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Bindings de ROCm SMI (opcional): consultan el driver sin lanzar el script rocm-smi
+try:
+    from pyrsmi import rocml
+    PYRSMI_AVAILABLE = True
+except ImportError:
+    PYRSMI_AVAILABLE = False
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +46,12 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+if PROMETHEUS_AVAILABLE:
+    STATS_CACHE_HITS = Counter("system_stats_cache_hits_total", "Respuestas de /system-stats servidas desde la caché")
+    STATS_CACHE_MISSES = Counter("system_stats_cache_misses_total", "Respuestas de /system-stats recalculadas")
+    STATS_LATENCY = Histogram("system_stats_latency_seconds", "Latencia del handler de /system-stats")
+    GPU_BACKEND = Gauge("gpu_backend", "Método de lectura de GPU seleccionado (1 = activo)", ["name"])
+
 # Permitir CORS para el frontend
 app.add_middleware(
     CORSMiddleware,
@@ -26,142 +61,620 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_cpu_usage() -> Optional[float]:
-    """Obtiene el uso de CPU de forma segura"""
+# Intervalo de muestreo en segundo plano (configurable por entorno)
+POLL_INTERVAL_SECONDS = float(os.getenv("AURA_POLL_INTERVAL_SECONDS", "2.0"))
+
+# Última instantánea de CPU/RAM/disco; el hilo de refresco la reemplaza entera en cada ciclo
+_cached_stats: Dict[str, Optional[float]] = {}
+
+# /proc/meminfo: solo interesan MemTotal y MemAvailable (mismo cálculo que psutil)
+MEMINFO_PATH = "/proc/meminfo"
+MEMINFO_TOTAL_RE = re.compile(rb'MemTotal:\s+(\d+)')
+MEMINFO_AVAILABLE_RE = re.compile(rb'MemAvailable:\s+(\d+)')
+
+# Descriptor de /proc/meminfo abierto una sola vez (None = sin abrir, -1 = no disponible)
+_meminfo_fd: Optional[int] = None
+
+def _read_meminfo_percent() -> Optional[float]:
+    """Calcula el uso de RAM con una lectura posicional de /proc/meminfo"""
+    global _meminfo_fd
+    if _meminfo_fd is None:
+        try:
+            _meminfo_fd = os.open(MEMINFO_PATH, os.O_RDONLY)
+        except OSError as e:
+            logger.debug(f"Error abriendo {MEMINFO_PATH}: {e}")
+            _meminfo_fd = -1
+    if _meminfo_fd < 0:
+        return None
+    
     try:
-        # Usar intervalo más corto para no bloquear
-        return psutil.cpu_percent(interval=0.1)
-    except Exception as e:
-        logger.error(f"Error obteniendo uso de CPU: {e}")
+        data = os.pread(_meminfo_fd, 4096, 0)
+    except OSError as e:
+        logger.debug(f"Error leyendo {MEMINFO_PATH}: {e}")
+        return None
+    
+    total = MEMINFO_TOTAL_RE.search(data)
+    available = MEMINFO_AVAILABLE_RE.search(data)
+    if not total or not available or int(total.group(1)) == 0:
         return None
+    total_kb = int(total.group(1))
+    return round((total_kb - int(available.group(1))) / total_kb * 100, 1)
 
-def get_ram_usage() -> Optional[float]:
-    """Obtiene el uso de RAM de forma segura"""
+def _sample_ram() -> Optional[float]:
+    """Lee el uso de RAM (meminfo directo, con psutil como respaldo)"""
     try:
-        mem = psutil.virtual_memory()
-        return mem.percent
+        usage = _read_meminfo_percent()
+        if usage is not None:
+            return usage
+        return psutil.virtual_memory().percent
     except Exception as e:
         logger.error(f"Error obteniendo uso de RAM: {e}")
         return None
 
-def get_ssd_usage() -> Optional[float]:
-    """Obtiene el uso de disco de forma segura"""
+# El uso de disco cambia en minutos, no en segundos: statvfs solo cada DISK_REFRESH_SECONDS
+DISK_REFRESH_SECONDS = float(os.getenv("AURA_DISK_REFRESH_SECONDS", "30"))
+_disk_cache: tuple = (0.0, None)  # (instante monotónico, porcentaje)
+
+def _sample_ssd() -> Optional[float]:
+    """Lee el uso de disco (cacheado durante DISK_REFRESH_SECONDS)"""
+    global _disk_cache
+    checked_at, percent = _disk_cache
+    now = time.monotonic()
+    if percent is not None and now - checked_at < DISK_REFRESH_SECONDS:
+        return percent
     try:
-        disk = psutil.disk_usage('/')
-        return disk.percent
+        percent = psutil.disk_usage('/').percent
+        _disk_cache = (now, percent)
+        return percent
     except Exception as e:
         logger.error(f"Error obteniendo uso de disco: {e}")
         return None
 
-def get_gpu_usage() -> Optional[float]:
-    """Obtiene el uso de GPU de forma segura"""
-    try:
-        # Método 1: ROCm-smi
+def _take_snapshot(cpu: Optional[float], average_gpu: bool = True) -> Dict[str, Optional[float]]:
+    """Construye una instantánea completa de CPU/RAM/disco (y el promedio de GPU sysfs)"""
+    return {
+        "cpu": cpu,
+        "ram": _sample_ram(),
+        "ssd": _sample_ssd(),
+        # El promedio tarda ~80 ms: solo desde el hilo de refresco, nunca en el handler
+        "gpu_busy": _sample_gpu_busy_avg() if average_gpu else None,
+        # Métodos de GPU lentos (subprocesos, sondeo, Ollama): también solo desde el hilo de refresco
+        **({"gpu_slow": _sample_slow_gpu()} if average_gpu else {}),
+        "taken_at": time.monotonic()
+    }
+
+# Sin consultas durante este tiempo, el hilo de refresco se detiene hasta la siguiente
+STATS_IDLE_SECONDS = float(os.getenv("AURA_STATS_IDLE_SECONDS", "30"))
+# Una instantánea más antigua que esto se considera caducada (p. ej. tras una pausa)
+STALE_SNAPSHOT_SECONDS = POLL_INTERVAL_SECONDS * 3
+
+_last_demand = 0.0
+_stats_demand = threading.Event()
+
+def _note_demand():
+    """Registra una consulta y despierta al hilo de refresco si estaba en pausa"""
+    global _last_demand
+    _last_demand = time.monotonic()
+    _stats_demand.set()
+
+def _wait_for_demand():
+    """Bloquea el hilo de refresco mientras nadie consulte las estadísticas"""
+    if time.monotonic() - _last_demand <= STATS_IDLE_SECONDS:
+        return
+    _stats_demand.clear()
+    # Volver a comprobar tras limpiar el evento para no perder una consulta concurrente
+    if time.monotonic() - _last_demand > STATS_IDLE_SECONDS:
+        logger.info("Sin consultas de estadísticas: refresco en pausa")
+        _stats_demand.wait()
+        logger.info("Consultas reanudadas: refresco activo")
+
+def _refresh_loop():
+    """Refresca CPU, RAM y disco continuamente fuera del handler HTTP"""
+    global _cached_stats
+    while True:
+        _wait_for_demand()
         try:
-            output = subprocess.check_output(
-                ["rocm-smi", "--showuse"], 
-                stderr=subprocess.DEVNULL, 
-                timeout=1
-            ).decode()
-            
-            for line in output.splitlines():
-                if "GPU use" in line and ":" in line:
-                    parts = line.split(":")
-                    if len(parts) >= 2:
-                        value_part = parts[-1].strip()
-                        import re
-                        match = re.search(r'(\d+(?:\.\d+)?)', value_part)
-                        if match:
-                            return float(match.group(1))
-                elif "%" in line and ("GPU" in line or "card" in line):
-                    match = re.search(r'(\d+(?:\.\d+)?)%', line)
-                    if match:
-                        return float(match.group(1))
+            # Bloquea solo este hilo durante el intervalo de medición
+            cpu = psutil.cpu_percent(interval=POLL_INTERVAL_SECONDS)
         except Exception as e:
-            logger.debug(f"ROCm-smi falló: {e}")
-        
-        # Método 2: amdgpu_top
+            logger.error(f"Error muestreando CPU: {e}")
+            cpu = None
+            time.sleep(POLL_INTERVAL_SECONDS)
+        # Reasignación atómica bajo el GIL: los lectores nunca ven una instantánea a medias
+        _cached_stats = _take_snapshot(cpu)
+
+def _start_stats_refresher():
+    """Arranca el hilo de refresco de estadísticas"""
+    psutil.cpu_percent(interval=None)  # Inicializa la referencia para lecturas no bloqueantes
+    threading.Thread(target=_refresh_loop, name="stats-refresher", daemon=True).start()
+
+def get_stats_snapshot() -> Dict[str, Optional[float]]:
+    """Devuelve la última instantánea de CPU/RAM/disco sin bloquear"""
+    global _cached_stats
+    _note_demand()
+    snapshot = _cached_stats
+    if snapshot and time.monotonic() - snapshot["taken_at"] <= STALE_SNAPSHOT_SECONDS:
+        return snapshot
+    # Sin instantánea reciente (arranque o refresco en pausa): lectura no bloqueante
+    # desde la última referencia de CPU
+    try:
+        cpu = psutil.cpu_percent(interval=None)
+    except Exception as e:
+        logger.error(f"Error obteniendo uso de CPU: {e}")
+        cpu = None
+    snapshot = _take_snapshot(cpu, average_gpu=False)
+    _cached_stats = snapshot
+    return snapshot
+
+# Patrones para interpretar la salida de rocm-smi (compilados una sola vez)
+GPU_VALUE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+GPU_PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)%')
+
+# Archivos sysfs con el uso de GPU directo (AMD)
+GPU_BUSY_PATHS = [
+    "/sys/class/drm/card0/device/gpu_busy_percent",
+    "/sys/class/drm/card1/device/gpu_busy_percent"
+]
+
+# Descriptor de gpu_busy_percent abierto una sola vez (None = sin abrir, -1 = no disponible)
+_gpu_busy_fd: Optional[int] = None
+
+def _open_gpu_busy() -> int:
+    """Busca (una sola vez) el primer gpu_busy_percent legible y lo deja abierto"""
+    global _gpu_busy_fd
+    if _gpu_busy_fd is not None:
+        return _gpu_busy_fd
+    _gpu_busy_fd = -1
+    
+    for path in GPU_BUSY_PATHS:
+        fd = -1
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            float(os.pread(fd, 32, 0))
+            _gpu_busy_fd = fd
+            logger.info(f"Usando {path} para el uso de GPU")
+            break
+        except (OSError, ValueError) as e:
+            logger.debug(f"Error leyendo {path}: {e}")
+            if fd >= 0:
+                os.close(fd)
+    return _gpu_busy_fd
+
+def _read_gpu_busy() -> Optional[float]:
+    """Lee gpu_busy_percent con una única lectura posicional del descriptor cacheado"""
+    fd = _open_gpu_busy()
+    if fd < 0:
+        return None
+    try:
+        return float(os.pread(fd, 32, 0))
+    except (OSError, ValueError) as e:
+        logger.debug(f"Error leyendo gpu_busy_percent: {e}")
+        return None
+
+# gpu_busy_percent es un valor instantáneo que oscila entre 0 y 100: se promedian
+# varias lecturas rápidas (~120 Hz, como radeontop) en el hilo de refresco
+GPU_BUSY_SAMPLES = 10
+GPU_BUSY_SAMPLE_GAP_SECONDS = 0.008
+
+def _sample_gpu_busy_avg() -> Optional[float]:
+    """Promedia varias lecturas de gpu_busy_percent (None si no está disponible)"""
+    if _open_gpu_busy() < 0:
+        return None
+    samples = []
+    for i in range(GPU_BUSY_SAMPLES):
+        value = _read_gpu_busy()
+        if value is None:
+            break
+        samples.append(value)
+        if i + 1 < GPU_BUSY_SAMPLES:
+            time.sleep(GPU_BUSY_SAMPLE_GAP_SECONDS)
+    return sum(samples) / len(samples) if samples else None
+
+def _method_gpu_busy() -> Optional[float]:
+    """Método rápido: promedio de gpu_busy_percent del hilo de refresco (o una lectura directa)"""
+    usage = _cached_stats.get("gpu_busy")
+    if usage is not None:
+        return usage
+    return _read_gpu_busy()
+
+# gpu_metrics: tabla binaria del driver amdgpu con actividad media, temperaturas y relojes.
+# Cabecera común "<HBB" (structure_size, format_revision, content_revision); el offset de
+# average_gfx_activity (uint16) depende de la revisión (ver kgd_pp_interface.h)
+GPU_METRICS_GLOB = "/sys/class/drm/card*/device/gpu_metrics"
+GPU_METRICS_HEADER = struct.Struct("<HBB")
+GPU_METRICS_GFX_ACTIVITY_OFFSETS = {
+    (1, 0): 28,  # dGPU: cabecera + system_clock_counter (alineado a 8) + 6 temperaturas
+    (1, 1): 16,  # dGPU: cabecera + 6 temperaturas
+    (1, 2): 16,
+    (1, 3): 16,
+    (2, 0): 40,  # APU: cabecera + system_clock_counter + 12 temperaturas
+    (2, 1): 28,  # APU: cabecera + 12 temperaturas
+    (2, 2): 28,
+    (2, 3): 28,
+    (2, 4): 28,
+}
+GPU_METRICS_INVALID = 0xFFFF
+
+# Descriptor de gpu_metrics y offset de la actividad (None = sin abrir, -1 = no disponible)
+_gpu_metrics_fd: Optional[int] = None
+_gpu_metrics_offset = 0
+
+def _open_gpu_metrics() -> int:
+    """Busca (una sola vez) una tabla gpu_metrics con revisión conocida y la deja abierta"""
+    global _gpu_metrics_offset
+    for path in sorted(glob.glob(GPU_METRICS_GLOB)):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError as e:
+            logger.debug(f"Error abriendo {path}: {e}")
+            continue
+        try:
+            header = os.pread(fd, GPU_METRICS_HEADER.size, 0)
+            _, format_rev, content_rev = GPU_METRICS_HEADER.unpack(header)
+            offset = GPU_METRICS_GFX_ACTIVITY_OFFSETS.get((format_rev, content_rev))
+            if offset is not None:
+                _gpu_metrics_offset = offset
+                logger.info(f"Usando {path} (gpu_metrics v{format_rev}_{content_rev}) para el uso de GPU")
+                return fd
+            logger.debug(f"Revisión de gpu_metrics no soportada en {path}: v{format_rev}_{content_rev}")
+        except (OSError, struct.error) as e:
+            logger.debug(f"Error leyendo {path}: {e}")
+        os.close(fd)
+    return -1
+
+def _read_gpu_metrics() -> Optional[float]:
+    """Lee average_gfx_activity de gpu_metrics con una lectura y un unpack"""
+    global _gpu_metrics_fd
+    if _gpu_metrics_fd is None:
+        _gpu_metrics_fd = _open_gpu_metrics()
+    if _gpu_metrics_fd < 0:
+        return None
+    
+    try:
+        data = os.pread(_gpu_metrics_fd, _gpu_metrics_offset + 2, 0)
+        (activity,) = struct.unpack_from("<H", data, _gpu_metrics_offset)
+    except (OSError, struct.error) as e:
+        logger.debug(f"Error leyendo gpu_metrics: {e}")
+        return None
+    
+    if activity == GPU_METRICS_INVALID or activity > 100:
+        return None
+    return float(activity)
+
+# pp_dpm_sclk: una línea por nivel ("1: 800Mhz *"), el asterisco marca el nivel activo
+SCLK_PATH = "/sys/class/drm/card0/device/pp_dpm_sclk"
+SCLK_LEVEL_RE = re.compile(rb'(\d+)Mhz(\s*\*)?')
+
+# Descriptor de bajo nivel de pp_dpm_sclk (None = sin abrir, -1 = no disponible)
+_sclk_fd: Optional[int] = None
+
+def _read_sclk_usage() -> Optional[float]:
+    """Estima el uso de GPU como frecuencia actual / máxima leyendo pp_dpm_sclk"""
+    global _sclk_fd
+    if _sclk_fd is None:
         try:
-            output = subprocess.check_output(
-                ["amdgpu_top", "-J", "-n", "1"], 
-                stderr=subprocess.DEVNULL, 
-                timeout=1
-            ).decode()
-            import json
-            data = json.loads(output)
-            if "gpu_activity" in data:
-                return float(data["gpu_activity"])
+            _sclk_fd = os.open(SCLK_PATH, os.O_RDONLY)
+        except OSError as e:
+            logger.debug(f"Error abriendo {SCLK_PATH}: {e}")
+            _sclk_fd = -1
+    if _sclk_fd < 0:
+        return None
+    
+    try:
+        # Una sola lectura posicional del archivo completo (<1 KB)
+        data = os.pread(_sclk_fd, 4096, 0)
+    except OSError as e:
+        logger.debug(f"Error leyendo {SCLK_PATH}: {e}")
+        return None
+    
+    max_freq = 0
+    current_freq = 0
+    for freq_bytes, active in SCLK_LEVEL_RE.findall(data):
+        freq = int(freq_bytes)
+        if freq > max_freq:
+            max_freq = freq
+        if active:
+            current_freq = freq
+    
+    if max_freq > 0 and current_freq > 0:
+        return min((current_freq / max_freq) * 100, 100.0)
+    return None
+
+# Resultado de la detección de Ollama reutilizado durante unos segundos
+OLLAMA_CHECK_TTL_SECONDS = 10.0
+_ollama_check: tuple = (0.0, False)  # (instante monotónico, detectado)
+
+def _ollama_running() -> bool:
+    """Indica si hay un proceso de Ollama sirviendo o ejecutando un modelo (recorre /proc/*/comm)"""
+    global _ollama_check
+    checked_at, running = _ollama_check
+    now = time.monotonic()
+    if checked_at and now - checked_at < OLLAMA_CHECK_TTL_SECONDS:
+        return running
+    
+    running = False
+    try:
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                # comm ocupa unos pocos bytes: solo se lee cmdline de los procesos "ollama*"
+                with open(f"{entry.path}/comm", "rb") as f:
+                    if not f.read().lower().startswith(b"ollama"):
+                        continue
+                with open(f"{entry.path}/cmdline", "rb") as f:
+                    cmd = f.read()
+            except OSError:
+                continue  # El proceso terminó o no es accesible
+            if b"serve" in cmd or b"run" in cmd:
+                running = True
+                break
+    except Exception as e:
+        logger.debug(f"Detección de Ollama falló: {e}")
+    
+    _ollama_check = (now, running)
+    return running
+
+ROCM_SMI_CMD = ["rocm-smi", "--showuse"]
+GPU_PROBE_TIMEOUT_SECONDS = 1.0
+
+def _parse_rocm_smi(output: str) -> Optional[float]:
+    """Extrae el uso de GPU de la salida de rocm-smi"""
+    for line in output.splitlines():
+        if "GPU use" in line and ":" in line:
+            parts = line.split(":")
+            if len(parts) >= 2:
+                value_part = parts[-1].strip()
+                match = GPU_VALUE_RE.search(value_part)
+                if match:
+                    return float(match.group(1))
+        elif "%" in line and ("GPU" in line or "card" in line):
+            match = GPU_PERCENT_RE.search(line)
+            if match:
+                return float(match.group(1))
+    return None
+
+# Estado de la inicialización de ROCm SMI (None = sin intentar)
+_rsmi_ready: Optional[bool] = None
+
+def _method_rsmi() -> Optional[float]:
+    """Método 1a: ROCm SMI vía pyrsmi (sin fork del intérprete de rocm-smi)"""
+    global _rsmi_ready
+    if not PYRSMI_AVAILABLE:
+        return None
+    if _rsmi_ready is None:
+        try:
+            rocml.smi_initialize()
+            _rsmi_ready = True
         except Exception as e:
-            logger.debug(f"amdgpu_top falló: {e}")
-        
-        # Método 3: Archivos del sistema
-        gpu_paths = [
-            "/sys/class/drm/card0/device/gpu_busy_percent",
-            "/sys/class/drm/card1/device/gpu_busy_percent",
-            "/sys/class/drm/card0/device/pp_dpm_sclk",
-            "/sys/kernel/debug/dri/0/amdgpu_pm_info"
-        ]
-        
-        for path in gpu_paths:
+            logger.debug(f"pyrsmi no pudo inicializarse: {e}")
+            _rsmi_ready = False
+    if not _rsmi_ready:
+        return None
+    try:
+        usage = rocml.smi_get_device_utilization(0)
+    except Exception as e:
+        logger.debug(f"pyrsmi falló: {e}")
+        return None
+    return float(usage) if usage is not None and usage >= 0 else None
+
+def _method_rocm_smi() -> Optional[float]:
+    """Método 1: ROCm-smi"""
+    try:
+        output = subprocess.check_output(
+            ROCM_SMI_CMD, 
+            stderr=subprocess.DEVNULL, 
+            timeout=GPU_PROBE_TIMEOUT_SECONDS
+        ).decode()
+        return _parse_rocm_smi(output)
+    except Exception as e:
+        logger.debug(f"ROCm-smi falló: {e}")
+    return None
+
+# amdgpu_top en modo streaming: un único proceso hijo emite una línea JSON por intervalo
+AMDGPU_TOP_CMD = ["amdgpu_top", "-J", "-s", str(max(int(POLL_INTERVAL_SECONDS * 1000), 100))]
+AMDGPU_TOP_FIRST_SAMPLE_TIMEOUT = 2.0
+
+_amdgpu_proc: Optional[subprocess.Popen] = None
+_latest_amdgpu: Optional[float] = None
+_amdgpu_first_sample = threading.Event()
+# get_gpu_usage se llama desde el hilo de refresco y desde el pool de hilos:
+# comprobar y lanzar el proceso bajo este lock para no dejar hijos huérfanos
+_amdgpu_lock = threading.Lock()
+
+def _amdgpu_reader(proc: subprocess.Popen):
+    """Consume la salida de amdgpu_top línea a línea y actualiza el último valor"""
+    global _latest_amdgpu
+    try:
+        for line in proc.stdout:
             try:
-                if "gpu_busy_percent" in path:
-                    with open(path, "r") as f:
-                        return float(f.read().strip())
-                elif "pp_dpm_sclk" in path:
-                    with open(path, "r") as f:
-                        lines = f.readlines()
-                        max_freq = 0
-                        current_freq = 0
-                        
-                        for line in lines:
-                            line = line.strip()
-                            if "Mhz" in line:
-                                freq = int(line.split(":")[1].strip().replace("Mhz", "").replace("*", "").strip())
-                                max_freq = max(max_freq, freq)
-                                if "*" in line:
-                                    current_freq = freq
-                        
-                        if max_freq > 0 and current_freq > 0:
-                            usage = (current_freq / max_freq) * 100
-                            return min(usage, 100.0)
-            except Exception as e:
-                logger.debug(f"Error leyendo {path}: {e}")
+                data = json.loads(line)
+                if "gpu_activity" in data and proc is _amdgpu_proc:
+                    _latest_amdgpu = float(data["gpu_activity"])
+                    _amdgpu_first_sample.set()
+            except (ValueError, TypeError):
                 continue
-        
-        # Método 4: radeontop
+    except Exception as e:
+        logger.debug(f"Lector de amdgpu_top terminó: {e}")
+    finally:
+        # El proceso terminó: no seguir sirviendo un valor congelado
+        # (salvo que ya lo haya reemplazado otro proceso)
+        with _amdgpu_lock:
+            if proc is _amdgpu_proc:
+                _latest_amdgpu = None
+                _amdgpu_first_sample.set()
+
+def _start_amdgpu_stream() -> bool:
+    """Lanza amdgpu_top en segundo plano si no está ya en marcha"""
+    global _amdgpu_proc, _latest_amdgpu
+    with _amdgpu_lock:
+        if _amdgpu_proc is not None and _amdgpu_proc.poll() is None:
+            return True
         try:
-            output = subprocess.check_output(
-                ["radeontop", "-d", "-", "-l", "1"], 
-                stderr=subprocess.DEVNULL, 
-                timeout=1
-            ).decode()
-            
-            for line in output.splitlines():
-                if "gpu" in line.lower():
-                    parts = line.split()
-                    for i, p in enumerate(parts):
-                        if "gpu" in p.lower() and i + 1 < len(parts):
-                            val = parts[i+1].replace('%','').replace(',','.')
-                            try:
-                                return float(val)
-                            except ValueError:
-                                continue
+            proc = subprocess.Popen(
+                AMDGPU_TOP_CMD,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=1,
+                text=True
+            )
         except Exception as e:
-            logger.debug(f"radeontop falló: {e}")
+            logger.debug(f"amdgpu_top falló: {e}")
+            return False
         
-        # Método 5: Detección de Ollama
+        _amdgpu_proc = proc
+        _latest_amdgpu = None
+        _amdgpu_first_sample.clear()
+    threading.Thread(target=_amdgpu_reader, args=(proc,), name="amdgpu-top-reader", daemon=True).start()
+    # Esperar la primera muestra para que el sondeo de métodos no lo descarte de entrada
+    _amdgpu_first_sample.wait(AMDGPU_TOP_FIRST_SAMPLE_TIMEOUT)
+    return True
+
+def _method_amdgpu_top() -> Optional[float]:
+    """Método 2: amdgpu_top (proceso persistente, sin fork por consulta)"""
+    if not _start_amdgpu_stream():
+        return None
+    return _latest_amdgpu
+
+def _parse_radeontop(output: str) -> Optional[float]:
+    """Extrae el uso de GPU de la salida de radeontop"""
+    for line in output.splitlines():
+        if "gpu" in line.lower():
+            parts = line.split()
+            for i, p in enumerate(parts):
+                if "gpu" in p.lower() and i + 1 < len(parts):
+                    # "gpu 12.50%," -> 12.50 (la coma final separa campos, no decimales)
+                    val = parts[i+1].rstrip(',').replace('%','').replace(',','.')
+                    try:
+                        return float(val)
+                    except ValueError:
+                        continue
+    return None
+
+# radeontop en modo streaming: un único proceso hijo vuelca una línea por intervalo
+RADEONTOP_CMD = ["radeontop", "-d", "-", "-i", str(max(int(POLL_INTERVAL_SECONDS), 1))]
+RADEONTOP_FIRST_SAMPLE_TIMEOUT = 2.0
+
+_radeontop_proc: Optional[subprocess.Popen] = None
+_latest_radeontop: Optional[float] = None
+_radeontop_first_sample = threading.Event()
+# Mismo motivo que _amdgpu_lock: un único proceso aunque llamen dos hilos a la vez
+_radeontop_lock = threading.Lock()
+
+def _radeontop_reader(proc: subprocess.Popen):
+    """Consume la salida de radeontop línea a línea y actualiza el último valor"""
+    global _latest_radeontop
+    try:
+        for line in proc.stdout:
+            usage = _parse_radeontop(line)
+            if usage is not None and proc is _radeontop_proc:
+                _latest_radeontop = usage
+                _radeontop_first_sample.set()
+    except Exception as e:
+        logger.debug(f"Lector de radeontop terminó: {e}")
+    finally:
+        # El proceso terminó: no seguir sirviendo un valor congelado
+        # (salvo que ya lo haya reemplazado otro proceso)
+        with _radeontop_lock:
+            if proc is _radeontop_proc:
+                _latest_radeontop = None
+                _radeontop_first_sample.set()
+
+def _start_radeontop_stream() -> bool:
+    """Lanza radeontop en segundo plano si no está ya en marcha"""
+    global _radeontop_proc, _latest_radeontop
+    with _radeontop_lock:
+        if _radeontop_proc is not None and _radeontop_proc.poll() is None:
+            return True
         try:
-            output = subprocess.check_output(
-                ["ps", "aux"], 
+            proc = subprocess.Popen(
+                RADEONTOP_CMD,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
-                timeout=1
-            ).decode()
-            
-            if any("ollama" in line.lower() and ("serve" in line or "run" in line) 
-                  for line in output.splitlines()):
-                return 15.0  # Valor conservador cuando Ollama está activo
+                bufsize=1,
+                text=True
+            )
         except Exception as e:
-            logger.debug(f"Detección de Ollama falló: {e}")
+            logger.debug(f"radeontop falló: {e}")
+            return False
+        
+        _radeontop_proc = proc
+        _latest_radeontop = None
+        _radeontop_first_sample.clear()
+    threading.Thread(target=_radeontop_reader, args=(proc,), name="radeontop-reader", daemon=True).start()
+    # Esperar la primera muestra para que el sondeo de métodos no lo descarte de entrada
+    _radeontop_first_sample.wait(RADEONTOP_FIRST_SAMPLE_TIMEOUT)
+    return True
+
+def _method_radeontop() -> Optional[float]:
+    """Método 4: radeontop (proceso persistente, sin fork por consulta)"""
+    if not _start_radeontop_stream():
+        return None
+    return _latest_radeontop
+
+# Métodos de lectura de GPU en orden de preferencia (los de sysfs directo son los más baratos)
+GPU_METHODS: List[Callable[[], Optional[float]]] = [
+    _read_gpu_metrics,   # Actividad media calculada por el firmware
+    _method_gpu_busy,
+    _method_rsmi,
+    _method_rocm_smi,
+    _method_amdgpu_top,
+    _read_sclk_usage,    # Método 3: frecuencia actual vs. máxima
+    _method_radeontop,
+]
+
+# Cada cuánto se vuelve a sondear la lista completa por si cambian drivers/herramientas
+GPU_METHOD_REPROBE_SECONDS = 300.0
+
+# Método que funcionó en el último sondeo (None = ninguno) y cuándo se sondeó
+_gpu_method: Optional[Callable[[], Optional[float]]] = None
+_gpu_method_probed_at = 0.0
+
+def _probe_gpu_methods() -> Optional[float]:
+    """Prueba todos los métodos en orden y memoriza el primero que devuelve un valor"""
+    global _gpu_method, _gpu_method_probed_at
+    _gpu_method_probed_at = time.monotonic()
+    for method in GPU_METHODS:
+        usage = method()
+        if usage is not None:
+            if method is not _gpu_method:
+                logger.info(f"Método de GPU seleccionado: {method.__name__}")
+                if PROMETHEUS_AVAILABLE:
+                    GPU_BACKEND.clear()
+                    GPU_BACKEND.labels(name=method.__name__).set(1)
+            _gpu_method = method
+            return usage
+    _gpu_method = None
+    if PROMETHEUS_AVAILABLE:
+        GPU_BACKEND.clear()
+    return None
+
+def _gpu_method_stale() -> bool:
+    """Indica si toca volver a sondear la lista completa de métodos"""
+    return (not _gpu_method_probed_at
+            or time.monotonic() - _gpu_method_probed_at >= GPU_METHOD_REPROBE_SECONDS)
+
+def get_gpu_usage() -> Optional[float]:
+    """Obtiene el uso de GPU de forma segura"""
+    try:
+        method = _gpu_method
+        if _gpu_method_stale():
+            usage = _probe_gpu_methods()
+        elif method is not None:
+            usage = method()
+            if usage is None:
+                # El método memorizado dejó de responder: volver a sondear todos
+                usage = _probe_gpu_methods()
+        else:
+            # Ningún método funcionó en el último sondeo: no reintentarlos hasta el próximo
+            usage = None
+        
+        if usage is not None:
+            return usage
+        
+        # Método 5: Detección de Ollama (depende del estado, no del hardware: no se memoriza)
+        if _ollama_running():
+            return 15.0  # Valor conservador cuando Ollama está activo
         
         return None
         
@@ -169,23 +682,170 @@ def get_gpu_usage() -> Optional[float]:
         logger.error(f"Error general obteniendo uso de GPU: {e}")
         return None
 
+# Métodos basados en subprocesos que pueden ejecutarse de forma nativa en el event loop
+ASYNC_GPU_PROBES = {
+    _method_rocm_smi: (ROCM_SMI_CMD, _parse_rocm_smi),
+}
+
+async def _run_probe_async(cmd: List[str]) -> Optional[str]:
+    """Ejecuta un comando de sondeo sin ocupar un hilo del pool (salida None si falla)"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except Exception as e:
+        logger.debug(f"{cmd[0]} falló: {e}")
+        return None
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=GPU_PROBE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        logger.debug(f"{cmd[0]} excedió el tiempo límite")
+        return None
+    return stdout.decode()
+
+# Métodos que leen sysfs o memoria en microsegundos: se pueden llamar dentro del handler
+INLINE_GPU_METHODS = (_read_gpu_metrics, _method_gpu_busy, _read_sclk_usage)
+
+# En algunos kernels AMD leer sysfs tarda más de 1 ms (como scaling_cur_freq en htop):
+# si una lectura en el handler supera el umbral, se sirve el valor del hilo de refresco un tiempo
+SLOW_GPU_READ_NS = 500_000
+SLOW_GPU_BACKOFF_SECONDS = 5.0
+_gpu_inline_slow_until = 0.0
+
+def _inline_gpu_slow() -> bool:
+    """Indica si las lecturas directas de GPU están en penalización por lentas"""
+    return time.monotonic() < _gpu_inline_slow_until
+
+def _sample_slow_gpu() -> Optional[float]:
+    """Ejecuta en el hilo de refresco las lecturas de GPU que no caben en el handler"""
+    if _gpu_method in INLINE_GPU_METHODS and not _gpu_method_stale() and not _inline_gpu_slow():
+        return None  # El handler la lee directamente
+    return get_gpu_usage()
+
+async def get_gpu_usage_async() -> Optional[float]:
+    """Obtiene el uso de GPU; si el método memorizado es un subproceso, lo espera en el event loop"""
+    global _gpu_inline_slow_until
+    method = _gpu_method
+    if not _gpu_method_stale():
+        snapshot = _cached_stats
+        fresh = "gpu_slow" in snapshot and time.monotonic() - snapshot["taken_at"] <= STALE_SNAPSHOT_SECONDS
+        if method in INLINE_GPU_METHODS and not (
+                _inline_gpu_slow() and fresh and snapshot["gpu_slow"] is not None):
+            started = time.perf_counter_ns()
+            usage = method()
+            if time.perf_counter_ns() - started > SLOW_GPU_READ_NS:
+                _gpu_inline_slow_until = time.monotonic() + SLOW_GPU_BACKOFF_SECONDS
+                logger.debug(f"Lectura lenta en {method.__name__}: se usa el hilo de refresco")
+            if usage is not None:
+                return usage
+        elif fresh:
+            # Subprocesos, amdgpu_top, Ollama o sysfs lento: último valor del hilo de refresco
+            return snapshot["gpu_slow"]
+    probe = ASYNC_GPU_PROBES.get(_gpu_method)
+    if probe is not None and not _gpu_method_stale():
+        cmd, parser = probe
+        output = await _run_probe_async(cmd)
+        usage = parser(output) if output else None
+        if usage is not None:
+            return usage
+    # Sondeo completo o métodos en memoria/sysfs: en el pool de hilos
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_gpu_usage)
+
+_start_stats_refresher()
+
+def _stats_etag(stats: Dict[str, Optional[float]]) -> str:
+    """ETag de las estadísticas cuantizadas al 1% (cambios menores no invalidan la caché)"""
+    return '"' + "-".join(
+        "x" if stats[key] is None else f"{stats[key]:.0f}"
+        for key in ("cpu", "ram", "ssd", "gpu")
+    ) + '"'
+
+# Respuestas de /system-stats reutilizadas durante este tiempo (agrupa pestañas y sondeos rápidos)
+STATS_RESPONSE_TTL_SECONDS = float(os.getenv("AURA_STATS_RESPONSE_TTL_SECONDS", "1.0"))
+_stats_response_cache: tuple = (0.0, None)  # (instante monotónico, estadísticas)
+# Se crea dentro del event loop de uvicorn (en Python < 3.10 el Lock se ata al loop actual)
+_stats_response_lock: Optional[asyncio.Lock] = None
+_stats_cache_counters = {"hits": 0, "misses": 0}
+
+def _count_cache_lookup(hit: bool):
+    """Contabiliza un acierto o fallo de la caché de respuestas"""
+    _stats_cache_counters["hits" if hit else "misses"] += 1
+    if PROMETHEUS_AVAILABLE:
+        (STATS_CACHE_HITS if hit else STATS_CACHE_MISSES).inc()
+
+async def _collect_stats() -> Dict[str, Optional[float]]:
+    """Reúne CPU/RAM/disco de la instantánea y la GPU del método memorizado"""
+    # CPU/RAM/disco salen de la instantánea en memoria; solo la GPU puede esperar.
+    # La instantánea va primero: registra la consulta y renueva el promedio de GPU si caducó
+    snapshot = get_stats_snapshot()
+    gpu = await get_gpu_usage_async()
+    stats = {
+        "cpu": snapshot["cpu"],
+        "ram": snapshot["ram"],
+        "ssd": snapshot["ssd"],
+        "gpu": gpu
+    }
+    
+    # Log si algún valor es None
+    none_values = [k for k, v in stats.items() if v is None]
+    if none_values:
+        logger.warning(f"Valores None en stats: {none_values}")
+    return stats
+
+async def get_cached_stats() -> Dict[str, Optional[float]]:
+    """Devuelve las estadísticas memorizadas si tienen menos de STATS_RESPONSE_TTL_SECONDS"""
+    global _stats_response_cache, _stats_response_lock
+    checked_at, stats = _stats_response_cache
+    if stats is not None and time.monotonic() - checked_at < STATS_RESPONSE_TTL_SECONDS:
+        _count_cache_lookup(True)
+        return stats
+    if _stats_response_lock is None:
+        _stats_response_lock = asyncio.Lock()
+    # Solo una petición recalcula; las concurrentes esperan y reutilizan su resultado
+    async with _stats_response_lock:
+        checked_at, stats = _stats_response_cache
+        if stats is not None and time.monotonic() - checked_at < STATS_RESPONSE_TTL_SECONDS:
+            _count_cache_lookup(True)
+            return stats
+        _count_cache_lookup(False)
+        stats = await _collect_stats()
+        _stats_response_cache = (time.monotonic(), stats)
+        return stats
+
+# Cuerpo JSON y ETag de las últimas estadísticas memorizadas (se serializan una vez por TTL)
+_stats_body_cache: tuple = (None, b"", "")  # (estadísticas, cuerpo, etag)
+
+def _encode_stats(stats: Dict[str, Optional[float]]) -> tuple:
+    """Devuelve (cuerpo, etag) de unas estadísticas, reutilizándolos si no han cambiado"""
+    global _stats_body_cache
+    cached_stats, body, etag = _stats_body_cache
+    if cached_stats is stats:
+        return body, etag
+    body = orjson.dumps(stats) if ORJSON_AVAILABLE else json.dumps(stats).encode()
+    etag = _stats_etag(stats)
+    _stats_body_cache = (stats, body, etag)
+    return body, etag
+
 @app.get("/system-stats")
-async def system_stats() -> Dict[str, Optional[float]]:
+async def system_stats(request: Request) -> Response:
     """Endpoint principal que devuelve todas las estadísticas del sistema"""
+    started = time.perf_counter()
     try:
-        stats = {
-            "cpu": get_cpu_usage(),
-            "ram": get_ram_usage(),
-            "ssd": get_ssd_usage(),
-            "gpu": get_gpu_usage()
-        }
+        stats = await get_cached_stats()
+        body, etag = _encode_stats(stats)
         
-        # Log si algún valor es None
-        none_values = [k for k, v in stats.items() if v is None]
-        if none_values:
-            logger.warning(f"Valores None en stats: {none_values}")
+        # Si el cliente ya tiene estos valores, responder 304 sin cuerpo
+        cache_headers = {"ETag": etag, "Cache-Control": "max-age=1"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
         
-        return stats
+        # Bytes ya serializados: sin codificar JSON en cada petición
+        return Response(content=body, media_type="application/json", headers=cache_headers)
         
     except Exception as e:
         logger.error(f"Error general en /system-stats: {e}")
@@ -196,13 +856,69 @@ async def system_stats() -> Dict[str, Optional[float]]:
                 "detail": str(e)
             }
         )
+    finally:
+        if PROMETHEUS_AVAILABLE:
+            STATS_LATENCY.observe(time.perf_counter() - started)
+
+@app.on_event("shutdown")
+def _close_stats_sources():
+    """Cierra los descriptores de sysfs/proc y los procesos de amdgpu_top/radeontop al parar la API"""
+    global _meminfo_fd, _gpu_busy_fd, _gpu_metrics_fd, _sclk_fd
+    for fd in (_meminfo_fd, _gpu_busy_fd, _gpu_metrics_fd, _sclk_fd):
+        if fd is not None and fd >= 0:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    _meminfo_fd = _gpu_busy_fd = _gpu_metrics_fd = _sclk_fd = -1
+    for proc in (_amdgpu_proc, _radeontop_proc):
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+
+@app.get("/metrics/cache")
+async def cache_metrics() -> Dict[str, Union[int, float]]:
+    """Aciertos y fallos de la caché de respuestas de /system-stats"""
+    return {**_stats_cache_counters, "ttl_seconds": STATS_RESPONSE_TTL_SECONDS}
+
+if PROMETHEUS_AVAILABLE:
+    # Formato de exposición de Prometheus en /metrics/ (las rutas /metrics/* anteriores tienen prioridad)
+    app.mount("/metrics", make_asgi_app())
+
+def _find_processes(names: List[str]) -> List[tuple]:
+    """Recorre /proc una vez y devuelve (pid, cmdline) de los procesos cuyo cmdline contiene algún nombre"""
+    patterns = [name.encode() for name in names]
+    own_pid = os.getpid()
+    found = []
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit() or int(entry.name) == own_pid:
+            continue
+        try:
+            with open(f"{entry.path}/cmdline", "rb") as f:
+                # Los argumentos vienen separados por NUL: unirlos con espacios como pgrep -f
+                cmdline = f.read().replace(b"\0", b" ").strip()
+        except OSError:
+            continue  # El proceso terminó o no es accesible
+        if any(pattern in cmdline for pattern in patterns):
+            found.append((int(entry.name), cmdline.decode(errors="replace")))
+    return found
+
+# Tiempo máximo de espera para confirmar que los procesos terminados desaparecen
+SHUTDOWN_WAIT_SECONDS = 0.2
+
+def _is_alive(pid: int) -> bool:
+    """Comprueba si un PID sigue existiendo (la señal 0 no se entrega)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
 @app.post("/shutdown")
-def shutdown_system():
+async def shutdown_system():
     """Apaga todos los servicios del sistema Aura"""
     try:
-        import signal
-        
         # Matar procesos específicos de Aura (excepto esta API para poder recibir comandos de encendido)
         processes_to_kill = [
             "aura_websocket_server.py",
@@ -211,47 +927,32 @@ def shutdown_system():
         
         killed_processes = []
         
-        for process_name in processes_to_kill:
-            try:
-                # Método 1: Obtener PIDs específicos y matarlos directamente
-                pids = []
-                
-                # Buscar procesos que coincidan con el nombre
-                result = subprocess.run(
-                    ["pgrep", "-f", process_name], 
-                    capture_output=True, 
-                    text=True
-                )
-                
-                if result.returncode == 0:
-                    pids.extend(result.stdout.strip().split('\n'))
-                
-                # También buscar con ruta completa
-                result = subprocess.run(
-                    ["pgrep", "-f", f"python {process_name}"], 
-                    capture_output=True, 
-                    text=True
-                )
-                
-                if result.returncode == 0:
-                    pids.extend(result.stdout.strip().split('\n'))
-                
-                # Remover duplicados y PIDs vacíos
-                pids = list(set([pid for pid in pids if pid and pid.isdigit()]))
-                
-                if pids:
-                    for pid in pids:
-                        # Forzar terminación inmediatamente ya que TERM no funciona bien
-                        subprocess.run(["kill", "-KILL", pid], capture_output=True)
-                    
-                    # Pequeña pausa para asegurar terminación
-                    import time
-                    time.sleep(0.5)
-                    
-                    killed_processes.append(process_name)
+        try:
+            # Identificar qué servicios están vivos y sus PIDs con un único recorrido de /proc
+            # (en el pool de hilos: el recorrido no debe bloquear el event loop)
+            loop = asyncio.get_running_loop()
+            running = await loop.run_in_executor(None, _find_processes, processes_to_kill)
+            killed_processes = [
+                name for name in processes_to_kill
+                if any(name in cmdline for _, cmdline in running)
+            ]
+            
+            # Forzar terminación inmediatamente ya que TERM no funciona bien
+            for pid, _ in running:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass  # Ya había terminado
+            
+            # Confirmar la terminación sondeando los PIDs (máximo SHUTDOWN_WAIT_SECONDS)
+            pending = [pid for pid, _ in running]
+            deadline = time.monotonic() + SHUTDOWN_WAIT_SECONDS
+            while pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+                pending = [pid for pid in pending if _is_alive(pid)]
                 
-            except Exception as e:
-                print(f"Error matando proceso {process_name}: {e}")
+        except Exception as e:
+            print(f"Error matando procesos {processes_to_kill}: {e}")
         
         return {
             "status": "success",
@@ -268,33 +969,24 @@ def shutdown_system():
 def startup_system():
     """Inicia todos los servicios del sistema Aura"""
     try:
-        import threading
-        import time
-        
-        # Función para iniciar servicios en background
-        def start_services():
-            time.sleep(1)  # Pequeña pausa antes de iniciar
-            
-            try:
-                # Iniciar nuevo WebSocket server usando el Python del entorno virtual
-                venv_python = os.path.join(os.path.dirname(os.path.abspath(__file__)), "venv", "bin", "python")
-                subprocess.Popen(
-                    [venv_python, "aura_websocket_server.py"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    cwd=os.path.dirname(os.path.abspath(__file__))
-                )
-                
-                # Pequeña pausa entre servicios
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"Error iniciando servicios: {e}")
+        # Lanzar el WebSocket server con el Python del entorno virtual mediante posix_spawn
+        # (sin fork: no se copia la tabla de páginas de esta API). posix_spawn no admite cwd,
+        # así que se usa la ruta absoluta del script (sus rutas ya son relativas a __file__)
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        venv_python = os.path.join(src_dir, "venv", "bin", "python")
+        script = os.path.join(src_dir, "aura_websocket_server.py")
+        pid = os.posix_spawn(
+            venv_python,
+            [venv_python, script],
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ]
+        )
         
-        # Iniciar servicios en thread separado
-        thread = threading.Thread(target=start_services)
-        thread.daemon = True
-        thread.start()
+        # Recoger el proceso cuando termine para no dejar zombis
+        threading.Thread(target=os.waitpid, args=(pid, 0), name="aura-reaper", daemon=True).start()
         
         return {
             "status": "success",
@@ -310,4 +1002,5 @@ def startup_system():
 if __name__ == "__main__":
     import uvicorn
     logger.info("Iniciando API de estadísticas del sistema...")
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
+    # loop="auto" usa uvloop si está instalado (ver requirements-optional.txt)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto") 
@@ -5,12 +5,14 @@ Extrae las tools actuales y crea un vector database para testear queries
 """
 
 import asyncio
+import hashlib
 import json
 import time
-from typing import Dict, List, Any, Tuple
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import warnings
 
 # Suprimir warnings
@@ -25,21 +27,72 @@ from client.config import get_mcp_servers_config
 from client.mcp_client import SimpleMCPClient
 
 
+# Modelo ONNX cuantizado a INT8 (publicado junto al modelo PyTorch en el Hub) usado para encode en CPU
+ONNX_QUANTIZED_FILE = os.getenv("AURA_EMBEDDINGS_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+# Tamaño de lote para indexar tools (todas las descripciones caben en pocas pasadas)
+EMBEDDING_BATCH_SIZE = 1024
+
+# Embeddings de tools cacheados en disco por hash de los textos (evita re-encodear en cada ejecución)
+EMBEDDINGS_CACHE_DIR = Path.home() / ".cache" / "aura"
+
+
+# Identificadores de backend: forman parte de la clave de caché (ONNX INT8 y PyTorch no dan
+# los mismos embeddings y no deben mezclarse entre tools y queries)
+ONNX_BACKEND = f"onnx:{ONNX_QUANTIZED_FILE}"
+TORCH_BACKEND = "torch"
+
+
+def load_embedding_model(model_name: str) -> Tuple[SentenceTransformer, str]:
+    """Cargar el modelo con ONNX Runtime INT8 si está disponible, o PyTorch como respaldo"""
+    try:
+        # Requiere sentence-transformers >= 3.2 y onnxruntime (pip install sentence-transformers[onnx])
+        model = SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": ONNX_QUANTIZED_FILE})
+        print(f"⚡ Backend ONNX Runtime INT8: {ONNX_QUANTIZED_FILE}")
+        return model, ONNX_BACKEND
+    except Exception as e:
+        print(f"⚠️ ONNX no disponible ({e}), usando PyTorch")
+        return SentenceTransformer(model_name), TORCH_BACKEND
+
+
 class ToolVectorDB:
     """Vector Database para tools usando sentence transformers"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", query_cache_size: int = 256,
+                 semantic_threshold: float = 0.97):
         """
         Inicializar vector DB con modelo de embeddings
         
         Args:
             model_name: Modelo de sentence transformers a usar
+            query_cache_size: Máximo de queries recientes cuyo resultado se reutiliza
+            semantic_threshold: Similitud coseno a partir de la cual una query reutiliza
+                el resultado de otra ya cacheada
         """
-        print(f"🔄 Cargando modelo de embeddings: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.model = None  # Se carga al primer encode (no hace falta si los embeddings están en caché)
+        self.model_backend = None  # Backend real del modelo cargado (ONNX_BACKEND o TORCH_BACKEND)
         self.tools_data = []
         self.tool_embeddings = None
-        print(f"✅ Modelo cargado: {model_name}")
+        self._texts_to_embed: List[str] = []
+        self._index_backend = None  # Backend con el que se generaron tool_embeddings
+        
+        # Caché LRU de queries: texto -> (fila en _query_emb_matrix, k, resultados)
+        self.query_cache_size = query_cache_size
+        self.semantic_threshold = semantic_threshold
+        self._query_cache: "OrderedDict[str, Tuple[int, int, List[Tuple[Dict[str, Any], float]]]]" = OrderedDict()
+        # Embeddings de las queries cacheadas, preasignados: las filas 0..len(caché)-1 están en uso
+        # y la fila de la query expulsada se reutiliza para la nueva (se actualiza in situ)
+        self._query_emb_matrix = None
+        self._query_row_keys: List[Optional[str]] = [None] * query_cache_size  # fila -> texto
+    
+    def _get_model(self) -> SentenceTransformer:
+        """Cargar el modelo de embeddings la primera vez que se necesita"""
+        if self.model is None:
+            print(f"🔄 Cargando modelo de embeddings: {self.model_name}")
+            self.model, self.model_backend = load_embedding_model(self.model_name)
+            print(f"✅ Modelo cargado: {self.model_name}")
+        return self.model
     
     def index_tools(self, tools: List[Dict[str, Any]]):
         """
@@ -79,14 +132,96 @@ class ToolVectorDB:
             
             texts_to_embed.append(full_text)
         
-        # Generar embeddings
+        # Los resultados cacheados apuntan al índice anterior
+        self._clear_query_cache()
+        
+        # Generar embeddings (o reutilizarlos de la caché en disco si los textos no cambiaron)
         start_time = time.time()
-        self.tool_embeddings = self.model.encode(texts_to_embed)
+        self._texts_to_embed = texts_to_embed
+        # Sin modelo cargado aún no se sabe qué backend habrá: probar ambos (se verifica al consultar)
+        backends = [self.model_backend] if self.model is not None else [ONNX_BACKEND, TORCH_BACKEND]
+        for backend in backends:
+            if self._load_cached_embeddings(backend):
+                break
+        else:
+            self._encode_tools()
         embedding_time = time.time() - start_time
         
         print(f"✅ {len(tools)} tools indexadas en {embedding_time:.2f}s")
         print(f"📊 Dimensión de embeddings: {self.tool_embeddings.shape}")
     
+    def _embeddings_cache_path(self, backend: str) -> Path:
+        """Ruta de la caché para los textos indexados y un backend concreto"""
+        cache_key = hashlib.sha256(
+            "\x1f".join([self.model_name, backend] + self._texts_to_embed).encode()
+        ).hexdigest()[:16]
+        return EMBEDDINGS_CACHE_DIR / f"tool_emb_{cache_key}.npy"
+    
+    def _load_cached_embeddings(self, backend: str) -> bool:
+        """Cargar los embeddings de la caché en disco (False si no existen o están corruptos)"""
+        cache_path = self._embeddings_cache_path(backend)
+        if not cache_path.exists():
+            return False
+        try:
+            embeddings = np.load(cache_path, mmap_mode="r")
+            if embeddings.ndim != 2 or embeddings.shape[0] != len(self._texts_to_embed):
+                raise ValueError(f"forma inesperada {embeddings.shape}")
+        except Exception as e:
+            print(f"⚠️ Caché de embeddings inválida ({e}), regenerando: {cache_path}")
+            return False
+        self.tool_embeddings = embeddings
+        self._index_backend = backend
+        print(f"💾 Embeddings cargados de caché: {cache_path}")
+        return True
+    
+    def _encode_tools(self):
+        """Generar, normalizar y guardar en caché los embeddings de las tools indexadas"""
+        model = self._get_model()
+        # encode() ya ordena los textos por longitud internamente; con lotes grandes cada
+        # pasada agrupa descripciones de tamaño parecido y apenas hay tokens de relleno
+        embeddings = model.encode(
+            self._texts_to_embed,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        # Normalizar una sola vez: la similitud coseno por query se reduce a un producto matriz-vector
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+        self.tool_embeddings = np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+        self._index_backend = self.model_backend
+        
+        cache_path = self._embeddings_cache_path(self.model_backend)
+        try:
+            EMBEDDINGS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            np.save(cache_path, self.tool_embeddings)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la caché de embeddings: {e}")
+    
+    def _clear_query_cache(self):
+        """Vaciar la caché de queries (las filas de la matriz se reutilizan)"""
+        self._query_cache.clear()
+        self._query_row_keys = [None] * self.query_cache_size
+    
+    def _store_query(self, query_text: str, query_embedding: np.ndarray, k: int,
+                     results: List[Tuple[Dict[str, Any], float]]):
+        """Guardar una query en la caché LRU, expulsando la más antigua si está llena"""
+        if self.query_cache_size <= 0:
+            return
+        if self._query_emb_matrix is None or self._query_emb_matrix.shape[1] != query_embedding.shape[0]:
+            self._query_emb_matrix = np.zeros((self.query_cache_size, query_embedding.shape[0]), dtype=np.float32)
+        
+        if query_text in self._query_cache:
+            row = self._query_cache.pop(query_text)[0]
+        elif len(self._query_cache) < self.query_cache_size:
+            row = len(self._query_cache)
+        else:
+            # La fila de la query expulsada pasa a la nueva
+            _, (row, _, _) = self._query_cache.popitem(last=False)
+        
+        self._query_emb_matrix[row] = query_embedding
+        self._query_row_keys[row] = query_text
+        self._query_cache[query_text] = (row, k, results)
+    
     def query_similar_tools(self, query_text: str, k: int = 10) -> List[Tuple[Dict[str, Any], float]]:
         """
         Buscar tools similares usando query vectorial
@@ -101,15 +236,43 @@ class ToolVectorDB:
         if self.tool_embeddings is None:
             raise ValueError("No hay tools indexadas")
         
-        # Generar embedding de la query
         start_time = time.time()
-        query_embedding = self.model.encode([query_text])
         
-        # Calcular similitudes con todas las tools
-        similarities = cosine_similarity(query_embedding, self.tool_embeddings)[0]
+        # Query idéntica reciente: sin pasar por el modelo
+        cached = self._query_cache.get(query_text)
+        if cached is not None and cached[1] >= k:
+            self._query_cache.move_to_end(query_text)
+            print(f"⚡ Query completada en {time.time() - start_time:.4f}s (caché)")
+            return cached[2][:k]
+        
+        # Generar embedding de la query (con el mismo backend que los embeddings de las tools)
+        model = self._get_model()
+        if self._index_backend != self.model_backend:
+            print(f"🔄 Embeddings en caché de otro backend ({self._index_backend}), regenerando")
+            self._encode_tools()
+            self._clear_query_cache()
+        query_embedding = model.encode([query_text], normalize_embeddings=True)[0].astype(np.float32)
         
-        # Obtener índices de los k más similares
-        top_k_indices = np.argsort(similarities)[::-1][:k]
+        # Query casi idéntica a una cacheada: reutilizar su resultado
+        if self._query_cache:
+            query_sims = self._query_emb_matrix[:len(self._query_cache)] @ query_embedding
+            best = int(np.argmax(query_sims))
+            if query_sims[best] > self.semantic_threshold:
+                similar_query = self._query_row_keys[best]
+                _, cached_k, cached_results = self._query_cache[similar_query]
+                if cached_k >= k:
+                    self._query_cache.move_to_end(similar_query)
+                    print(f"⚡ Query completada en {time.time() - start_time:.4f}s (caché semántica)")
+                    return cached_results[:k]
+        
+        # Calcular similitudes con todas las tools (embeddings ya normalizados: coseno = producto punto)
+        similarities = self.tool_embeddings @ query_embedding
+        
+        # Obtener índices de los k más similares: selección O(N) y orden solo de esos k
+        requested_k = k
+        k = min(k, len(similarities))
+        part = np.argpartition(similarities, -k)[-k:] if k > 0 else np.empty(0, dtype=np.intp)
+        top_k_indices = part[np.argsort(similarities[part])[::-1]]
         
         query_time = time.time() - start_time
         
@@ -120,6 +283,8 @@ class ToolVectorDB:
             similarity_score = similarities[idx]
             results.append((tool_data, similarity_score))
         
+        self._store_query(query_text, query_embedding, requested_k, results)
+        
         print(f"⚡ Query completada en {query_time:.4f}s")
         return results
 
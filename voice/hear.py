@@ -21,9 +21,14 @@ class SpeechToText:
         print(f"Loading {language.upper()} model: {self.models[language]}")
         self.model = vosk.Model(self.model_path)
         self.rec = vosk.KaldiRecognizer(self.model, 16000)
+        # Loaded models per language so switching back is instant. Only the Model is
+        # cached: callers may replace self.rec, so a fresh recognizer is built on switch
+        self.loaded_models = {language: self.model}
         
         self.p = pyaudio.PyAudio()
         self.stream = None
+        # Frames per read (500 ms at 16 kHz) to halve AcceptWaveform calls
+        self.chunk_size = 8000
         
     def get_available_languages(self):
         return list(self.models.keys())
@@ -32,40 +37,51 @@ class SpeechToText:
         if language not in self.models:
             raise ValueError(f"Language {language} not supported. Available: {list(self.models.keys())}")
         
-        # Close current streams
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            
+        # The input stream does not depend on the model: keep it open
+        
+        # Reuse an already loaded model (trades RAM for instant switching)
+        if language in self.loaded_models:
+            self.language = language
+            self.model_path = os.path.join(os.path.dirname(__file__), self.models[language])
+            self.model = self.loaded_models[language]
+            self.rec = vosk.KaldiRecognizer(self.model, 16000)
+            print(f"Switching to {language.upper()} model: {self.models[language]} (cached)")
+            return
+        
         # Load new model
-        self.language = language
-        self.model_path = os.path.join(os.path.dirname(__file__), self.models[language])
+        model_path = os.path.join(os.path.dirname(__file__), self.models[language])
         
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError(f"Vosk model not found at {self.model_path}")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
             
         print(f"Switching to {language.upper()} model: {self.models[language]}")
+        self.language = language
+        self.model_path = model_path
         self.model = vosk.Model(self.model_path)
         self.rec = vosk.KaldiRecognizer(self.model, 16000)
+        self.loaded_models[language] = self.model
         
     def start_listening(self):
-        self.stream = self.p.open(format=pyaudio.paInt16,
-                                  channels=1,
-                                  rate=16000,
-                                  input=True,
-                                  frames_per_buffer=8000)
-        self.stream.start_stream()
+        # Open the device once and reuse it; later calls only restart the stream
+        if self.stream is None:
+            self.stream = self.p.open(format=pyaudio.paInt16,
+                                      channels=1,
+                                      rate=16000,
+                                      input=True,
+                                      frames_per_buffer=self.chunk_size)
+        if not self.stream.is_active():
+            self.stream.start_stream()
         
     def stop_listening(self):
-        if self.stream:
+        # Pause capture but keep the device open for the next utterance
+        if self.stream and self.stream.is_active():
             self.stream.stop_stream()
-            self.stream.close()
             
     def listen_once(self, timeout=5):
         if not self.stream or not self.stream.is_active():
             self.start_listening()
             
-        data = self.stream.read(4000)
+        data = self.stream.read(self.chunk_size)
         if len(data) == 0:
             return None
             
@@ -83,7 +99,7 @@ class SpeechToText:
         print("Listening... Press Ctrl+C to stop")
         try:
             while True:
-                data = self.stream.read(4000)
+                data = self.stream.read(self.chunk_size)
                 if len(data) == 0:
                     break
                     
@@ -113,7 +129,7 @@ class SpeechToText:
         
         transcription = ""
         while True:
-            data = wf.readframes(4000)
+            data = wf.readframes(self.chunk_size)
             if len(data) == 0:
                 break
             if rec.AcceptWaveform(data):
@@ -130,4 +146,5 @@ class SpeechToText:
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
         self.p.terminate()
\ No newline at end of file